@@ -4,42 +4,695 @@
 
 import re
 import os
-from datetime import date
+import sys
+import bz2
+import csv
+import glob
+import gzip
+import json
+import hashlib
+import lzma
+import mmap
+import heapq
+import time
+import socket
+import sqlite3
+import argparse
+from datetime import date, datetime, timezone
 from collections import Counter
+from functools import lru_cache, partial
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
 from geoip import geolite2
 
 log_file = '/home/student/syslog.log'
 
-# Clear the terminal screen
-os.system('clear')
+# Where incremental mode keeps the counts and read position between runs
+state_file = os.path.expanduser('~/.attacker_report_state.json')
 
-# Get the current date in the format "Month Day, Year"
-today = date.today().strftime("%B %d, %Y")
-print(f"\033[92mAttacker Report\033[0m - {today}\n")
-print("\033[91mCOUNT\t\tIP ADDRESS\t\tCOUNTRY\033[0m")
+# Where country lookups are kept between runs
+geoip_cache_file = os.path.expanduser('~/.attacker_report_geoip.json')
 
-# Read the entire log file
-with open(log_file, 'r') as f:
-    log_content = f.read()
+# Bytes at the start of the log that are hashed to recognise it again after a copytruncate rotation
+FINGERPRINT_SIZE = 4096
 
-# Regular expression to find IP addresses in "Failed password" lines
-# Matches IPs in the format xxx.xxx.xxx.xxx after "from"
-ip_pattern = r"Failed password for .* from (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"
+# Size of each read from the log file, so memory stays flat no matter how big the log gets
+CHUNK_SIZE = 1024 * 1024
 
-# Find all matching IPs
-failed_ips = re.findall(ip_pattern, log_content)
+# Cheap substring check that runs before the regex, most syslog lines never reach the regex
+FAILED_MARKER = b"Failed password"
 
-# Count the occurrences of each IP
-ip_counts = Counter(failed_ips)
+# An IPv4 address in the format xxx.xxx.xxx.xxx, or an IPv6 address (anything hex with a colon in it)
+IP = rb"(?:\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}|[0-9A-Fa-f]*:[0-9A-Fa-f:.]*[0-9A-Fa-f])"
 
-# Filter IPs with 10 or more failed attempts
-filtered_ips = {ip: count for ip, count in ip_counts.items() if count >= 10}
+# Regular expression for failed logins, both for real and invalid users:
+#   sshd[1]: Failed password for [invalid user] <user> from <ip> port 22 ssh2
+# sshd also writes an "Invalid user" and a pam_unix "authentication failure" line for the same attempt,
+# those are left out so each attempt counts once, and so the pattern keeps its literal prefix for fast searching
+# The greedy .* means a username containing " from x.x.x.x" cannot hide the real source address
+auth_pattern = re.compile(rb"Failed password for (?:invalid user )?(.*) from (" + IP + rb")")
 
-# Sort the filtered IPs by count in ascending order
-sorted_ips = sorted(filtered_ips.items(), key=lambda x: x[1])
+def read_chunks(f, chunk_size=CHUNK_SIZE, limit=None):
+    """
+    Yields fixed-size blocks of bytes from an open binary file until EOF, or until limit bytes are read
+    """
+    while limit is None or limit > 0:
+        size = chunk_size if limit is None else min(chunk_size, limit)
+        chunk = f.read(size)
+        if not chunk:
+            break
+        if limit is not None:
+            limit -= len(chunk)
+        yield chunk
 
-# For each IP, look up the country and print the row
-for ip, count in sorted_ips:
+def split_lines(chunks):
+    """
+    Yields complete lines from a stream of chunks, carrying partial lines over to the next chunk
+    """
+    leftover = b""
+    for chunk in chunks:
+        lines = (leftover + chunk).split(b"\n")
+        # The last piece has no newline yet, keep it for the next chunk
+        leftover = lines.pop()
+        yield from lines
+    if leftover:
+        yield leftover
+
+def failed_lines(lines):
+    """
+    Yields only the lines that contain a failed password attempt
+    """
+    for line in lines:
+        if FAILED_MARKER in line:
+            yield line
+
+def username(raw):
+    """
+    Decodes a username from the log, escaping anything that is not printable so it cannot mess with the terminal
+    """
+    name = raw.decode('utf-8', 'replace')
+    if not name.isprintable():
+        name = name.encode('unicode_escape').decode('ascii')
+    return name
+
+def match_event(match):
+    """
+    Turns a match of auth_pattern into an (ip, username) pair, username is None when the line has none
+    """
+    user, ip = match.groups()
+    return ip.decode('ascii'), username(user) if user else None
+
+def extract_events(lines):
+    """
+    Yields an (ip, username) pair for each failed login line
+    """
+    for line in lines:
+        match = auth_pattern.search(line)
+        if match:
+            yield match_event(match)
+
+def network_keys(ips, prefix):
+    """
+    Maps IP strings to integer-packed network keys, e.g. with prefix 24 1.2.3.4 becomes the int of 1.2.3.0
+    """
+    # Calculate the network mask from the prefix length
+    mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+    for ip in ips:
+        try:
+            yield int.from_bytes(socket.inet_aton(ip), 'big') & mask
+        except OSError:
+            # IPv6 sources are kept per address, anything else (like 999.1.1.1) is not an address
+            if ':' in ip:
+                yield ip
+
+def network_name(key, prefix):
+    """
+    Turns an integer-packed network key back into "a.b.c.d/prefix", IPv6 keys are already addresses
+    """
+    if isinstance(key, str):
+        return key
+    return f"{socket.inet_ntoa(key.to_bytes(4, 'big'))}/{prefix}"
+
+def count_users(events, users):
+    """
+    Counts the targeted username of each event and passes its IP along
+    """
+    for ip, user in events:
+        if user:
+            users[user] += 1
+        yield ip
+
+def tally(counts, events, prefix=None, users=None):
+    """
+    Adds (ip, username) events to the Counters, IPs either as they are or folded into their /prefix network
+    """
+    if users is None:
+        ips = (ip for ip, _ in events)
+    else:
+        ips = count_users(events, users)
+    counts.update(ips if prefix is None else network_keys(ips, prefix))
+
+def aggregate_counts(ip_counts, prefix):
+    """
+    Folds an existing per-IP Counter into per-network counts keyed by integer-packed network
+    """
+    counts = Counter()
+    for ip, count in ip_counts.items():
+        for key in network_keys((ip,), prefix):
+            counts[key] += count
+    return counts
+
+# Rotated logs are often compressed, pick the opener from the file extension
+OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+def open_log(path):
+    """
+    Opens a plain, gzip, bz2 or xz log file for binary reading
+    """
+    opener = OPENERS.get(os.path.splitext(path)[1], open)
+    return opener(path, 'rb')
+
+def expand_log_files(patterns):
+    """
+    Expands a list of file names and glob patterns into the list of log files to scan
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        # Keep names that match nothing so opening them reports the missing file
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+def scan_stream(f, counts, limit=None, prefix=None, users=None):
+    """
+    Stream engine: reads the open file in chunks and runs the regex only on prefiltered lines
+    """
+    # Update the Counters as each event comes out of the pipeline
+    tally(counts, extract_events(failed_lines(split_lines(read_chunks(f, limit=limit)))), prefix, users)
+
+def scan_mmap(f, counts, limit=None, prefix=None, users=None):
+    """
+    Mmap engine: runs the bytes regex straight over the mapped file, without decoding or copying it
+    """
+    start = f.tell()
+    end = os.fstat(f.fileno()).st_size if limit is None else start + limit
+    if end <= start:
+        # mmap refuses empty files, and there is nothing to scan anyway
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # The OS reads the file front to back, tell it so it can read ahead aggressively
+        if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        tally(counts, map(match_event, auth_pattern.finditer(mm, start, end)), prefix, users)
+
+ENGINES = {
+    'stream': scan_stream,
+    'mmap': scan_mmap,
+}
+
+def count_failures(path, counts=None, engine='stream', prefix=None, users=None):
+    """
+    Scans the log file at path with the chosen engine and returns a Counter of failed attempts per IP
+
+    With a prefix the Counter is keyed by integer-packed /prefix network instead of IP string.
+    If a users Counter is given, failed attempts per targeted username are added to it in the same pass.
+    """
+    if counts is None:
+        counts = Counter()
+    # Compressed files cannot be mapped, they always go through the stream engine
+    if os.path.splitext(path)[1] in OPENERS:
+        engine = 'stream'
+    with open_log(path) as f:
+        ENGINES[engine](f, counts, prefix=prefix, users=users)
+    return counts
+
+def count_file(path, engine='stream', prefix=None):
+    """
+    Worker for count_failures_many, returns the per-IP and per-username Counters of one file
+    """
+    users = Counter()
+    counts = count_failures(path, engine=engine, prefix=prefix, users=users)
+    return counts, users
+
+def count_failures_many(paths, jobs=None, engine='stream', prefix=None, users=None):
+    """
+    Parses each log file in its own worker process and merges the per-file Counters
+    """
+    counts = Counter()
+    if len(paths) == 1 or jobs == 1:
+        for path in paths:
+            count_failures(path, counts, engine, prefix, users)
+        return counts
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for file_counts, file_users in pool.map(partial(count_file, engine=engine, prefix=prefix), paths):
+            counts.update(file_counts)
+            if users is not None:
+                users.update(file_users)
+    return counts
+
+def last_line_end(f, size):
+    """
+    Returns the offset just past the last newline in the file, so a half-written line is left for the next run
+    """
+    end = size
+    while end > 0:
+        start = max(0, end - CHUNK_SIZE)
+        f.seek(start)
+        block = f.read(end - start)
+        newline = block.rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        end = start
+    return 0
+
+def load_state(path):
+    """
+    Loads the saved incremental state, or returns None if there is no usable state file
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_state(path, state):
+    """
+    Writes the incremental state to a temp file and swaps it into place so a crash never leaves half a file
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def head_fingerprint(f, length):
+    """
+    Returns a hash of the first length bytes of the open file, so a log truncated and rewritten in place is noticed
+    """
+    f.seek(0)
+    return hashlib.sha256(f.read(length)).hexdigest()
+
+def count_failures_incremental(path, state_path=state_file, engine='stream', users=None):
+    """
+    Parses only the bytes appended since the last run and returns the running Counter of failed attempts per IP
+
+    If a users Counter is given, the running per-username counts are added to it.
+
+    Falls back to a full rescan when the log was rotated (new inode) or truncated (smaller than the saved offset,
+    or its first bytes changed because it was truncated and has since grown past the saved offset again).
+    """
+    state = load_state(state_path)
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if (state and state.get('log_file') == os.path.abspath(path)
+                and state.get('inode') == st.st_ino and state.get('device') == st.st_dev
+                and state.get('offset', 0) <= st.st_size
+                and state.get('fingerprint') == head_fingerprint(f, min(state.get('offset', 0), FINGERPRINT_SIZE))):
+            # Same file as last time and it only grew, pick up where we left off
+            counts = Counter(state.get('counts', {}))
+            user_counts = Counter(state.get('users', {}))
+            offset = state['offset']
+        else:
+            # First run, rotated or truncated log, start over from byte zero
+            counts = Counter()
+            user_counts = Counter()
+            offset = 0
+
+        # Only parse complete lines, the rest is picked up next run
+        end = last_line_end(f, st.st_size) if st.st_size > offset else offset
+        if end > offset:
+            f.seek(offset)
+            ENGINES[engine](f, counts, limit=end - offset, users=user_counts)
+        fingerprint = head_fingerprint(f, min(end, FINGERPRINT_SIZE))
+
+    save_state(state_path, {
+        'log_file': os.path.abspath(path),
+        'inode': st.st_ino,
+        'device': st.st_dev,
+        'fingerprint': fingerprint,
+        'offset': end,
+        'counts': dict(counts),
+        'users': dict(user_counts),
+    })
+    if users is not None:
+        users.update(user_counts)
+    return counts
+
+class LogFollower(object):
+    """
+    Follows a log file the way tail -F does, counting failed attempts as lines are appended.
+
+    Polls with os.stat instead of inotify, which needs no extra packages and costs one
+    syscall per poll. A new inode means the log was rotated: the rest of the old file is
+    read first, then the new file is followed from the start. A file that shrinks was
+    truncated and is read again from the start.
+    """
+    def __init__(self, path, prefix=None):
+        self.path = path
+        self.prefix = prefix
+        self.counts = Counter()
+        self.users = Counter()
+        self.f = None
+        self.leftover = b""
+
+    def _read_new(self):
+        # Count every complete line appended since the last read, keep the partial line for later
+        for chunk in read_chunks(self.f):
+            lines = (self.leftover + chunk).split(b"\n")
+            self.leftover = lines.pop()
+            tally(self.counts, extract_events(failed_lines(lines)), self.prefix, self.users)
+
+    def _reopen(self):
+        # Switch to whatever file is at the path now, if any
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        self.leftover = b""
+        try:
+            self.f = open(self.path, 'rb')
+        except FileNotFoundError:
+            # Rotated away and not recreated yet, try again on the next poll
+            pass
+
+    def poll(self):
+        # Read whatever was appended, then check whether the log was rotated or truncated
+        if self.f is None:
+            self._reopen()
+            if self.f is None:
+                return
+        self._read_new()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        current = os.fstat(self.f.fileno())
+        if (st.st_ino, st.st_dev) != (current.st_ino, current.st_dev):
+            self._reopen()
+            if self.f is not None:
+                self._read_new()
+        elif st.st_size < self.f.tell():
+            self.f.seek(0)
+            self.leftover = b""
+            self._read_new()
+
+    def close(self):
+        # Close the file being followed
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+@lru_cache(maxsize=65536)
+def lookup_country(ip):
+    """
+    Looks up the country of one IP in the GeoIP database, remembering recent answers in memory
+    """
     match = geolite2.lookup(ip)
-    country = match.country if match else "Unknown"
-    print(f"{count}\t\t{ip}\t\t{country}")
\ No newline at end of file
+    return match.country if match else "Unknown"
+
+def geoip_db_date():
+    """
+    Returns the build date of the GeoIP database as a string, used to tell when cached lookups are stale
+    """
+    info = geolite2.get_info()
+    db_date = getattr(info, 'date', None)
+    return db_date.isoformat() if db_date else None
+
+class GeoIPCache(object):
+    """
+    Country lookups persisted to disk between runs.
+
+    The whole cache is thrown away when the GeoIP database build date changes,
+    so answers are never older than the database they came from.
+    """
+    def __init__(self, path=None):
+        # A path of None keeps the cache in memory only
+        self.path = path
+        self.db_date = geoip_db_date()
+        self.countries = {}
+        self.dirty = False
+        state = load_state(path) if path else None
+        if state and state.get('db_date') == self.db_date:
+            self.countries = state.get('countries', {})
+
+    def lookup(self, ip):
+        # Look up a single IP, going to the database only on a cache miss
+        country = self.countries.get(ip)
+        if country is None:
+            country = lookup_country(ip)
+            self.countries[ip] = country
+            self.dirty = True
+        return country
+
+    def lookup_many(self, ips):
+        # Resolve many IPs at once, each distinct IP is looked up at most once
+        return {ip: self.lookup(ip) for ip in set(ips)}
+
+    def save(self):
+        # Write the cache back only if something new was looked up
+        if self.path and self.dirty:
+            save_state(self.path, {'db_date': self.db_date, 'countries': self.countries})
+            self.dirty = False
+
+def select_rows(ip_counts, threshold=10, top=None):
+    """
+    Returns the (key, count) pairs at or above threshold in ascending order of count, limited to the top entries if given
+    """
+    # Filter IPs with at least threshold failed attempts
+    filtered_ips = ((ip, count) for ip, count in ip_counts.items() if count >= threshold)
+
+    if top is not None:
+        # Keep only the top entries in a bounded heap instead of sorting everything
+        return heapq.nlargest(top, filtered_ips, key=itemgetter(1))[::-1]
+    # Sort the filtered IPs by count in ascending order
+    return sorted(filtered_ips, key=itemgetter(1))
+
+def build_rows(ip_counts, geoip_cache, threshold=10, top=None, prefix=None, user_counts=None):
+    """
+    Returns the report rows, (count, ip, country) per IP (or /prefix network) and (count, username) per username
+    """
+    sorted_ips = select_rows(ip_counts, threshold, top)
+    if prefix is not None:
+        # Networks are shown as a.b.c.0/prefix and located by their network address
+        sorted_ips = [(network_name(key, prefix), count) for key, count in sorted_ips]
+
+    # Look up the country of every IP in one batch
+    countries = geoip_cache.lookup_many(ip.split('/')[0] for ip, _ in sorted_ips)
+    geoip_cache.save()
+    ip_rows = [(count, ip, countries[ip.split('/')[0]]) for ip, count in sorted_ips]
+
+    user_rows = None
+    if user_counts is not None:
+        user_rows = [(count, user) for user, count in select_rows(user_counts, threshold, top)]
+    return ip_rows, user_rows
+
+def render_table(ip_rows, user_rows):
+    """
+    Clears the screen and prints the colored COUNT/IP ADDRESS/COUNTRY table, then the usernames
+    """
+    # Clear the terminal screen
+    os.system('clear')
+
+    # Get the current date in the format "Month Day, Year"
+    today = date.today().strftime("%B %d, %Y")
+    print(f"\033[92mAttacker Report\033[0m - {today}\n")
+    print("\033[91mCOUNT\t\tIP ADDRESS\t\tCOUNTRY\033[0m")
+    for count, ip, country in ip_rows:
+        print(f"{count}\t\t{ip}\t\t{country}")
+
+    if user_rows is not None:
+        print("\n\033[91mCOUNT\t\tUSERNAME\033[0m")
+        for count, user in user_rows:
+            print(f"{count}\t\t{user}")
+
+def render_json(ip_rows, user_rows):
+    """
+    Prints the report as a single JSON document
+    """
+    report = {
+        'date': date.today().isoformat(),
+        'ips': [{'count': count, 'ip': ip, 'country': country} for count, ip, country in ip_rows],
+    }
+    if user_rows is not None:
+        report['users'] = [{'count': count, 'username': user} for count, user in user_rows]
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+def render_ndjson(ip_rows, user_rows):
+    """
+    Prints one JSON object per line, IP rows first and then username rows
+    """
+    for count, ip, country in ip_rows:
+        print(json.dumps({'type': 'ip', 'count': count, 'ip': ip, 'country': country}))
+    for count, user in user_rows or ():
+        print(json.dumps({'type': 'user', 'count': count, 'username': user}))
+
+def render_csv(ip_rows, user_rows):
+    """
+    Prints the report as CSV with a type column telling IP rows from username rows
+    """
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['type', 'count', 'value', 'country'])
+    for count, ip, country in ip_rows:
+        writer.writerow(['ip', count, ip, country])
+    for count, user in user_rows or ():
+        writer.writerow(['user', count, user, ''])
+
+RENDERERS = {
+    'table': render_table,
+    'json': render_json,
+    'ndjson': render_ndjson,
+    'csv': render_csv,
+}
+
+# History tables, count is the latest count seen and the timestamps are UTC ISO 8601
+SQLITE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS attackers (
+        ip TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        country TEXT,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS attackers_last_seen ON attackers (last_seen)",
+    "CREATE INDEX IF NOT EXISTS attackers_count ON attackers (count)",
+    """CREATE TABLE IF NOT EXISTS usernames (
+        username TEXT PRIMARY KEY,
+        count INTEGER NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS usernames_last_seen ON usernames (last_seen)",
+)
+
+def save_sqlite(path, ip_rows, user_rows):
+    """
+    Upserts the report rows into the SQLite history database, all in one transaction
+    """
+    now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    db = sqlite3.connect(path)
+    try:
+        # The connection commits once when the block ends, or rolls everything back on an error
+        with db:
+            for statement in SQLITE_SCHEMA:
+                db.execute(statement)
+            db.executemany(
+                "INSERT INTO attackers (ip, count, country, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (ip) DO UPDATE SET count = excluded.count, country = excluded.country, last_seen = excluded.last_seen",
+                ((ip, count, country, now, now) for count, ip, country in ip_rows))
+            db.executemany(
+                "INSERT INTO usernames (username, count, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (username) DO UPDATE SET count = excluded.count, last_seen = excluded.last_seen",
+                ((user, count, now, now) for count, user in user_rows or ()))
+    finally:
+        db.close()
+
+def print_report(ip_counts, geoip_cache=None, threshold=10, top=None, prefix=None, user_counts=None,
+                 output_format='table', sqlite_path=None):
+    """
+    Prints the report with one row per IP (or /prefix network) with threshold or more failed attempts
+
+    If user_counts is given, the targeted usernames are listed the same way.
+    If sqlite_path is given, the rows are also upserted into that SQLite database.
+    """
+    if geoip_cache is None:
+        geoip_cache = GeoIPCache()
+    ip_rows, user_rows = build_rows(ip_counts, geoip_cache, threshold, top, prefix, user_counts)
+    if sqlite_path:
+        save_sqlite(sqlite_path, ip_rows, user_rows)
+    RENDERERS[output_format](ip_rows, user_rows)
+
+def follow_report(path, interval, geoip_cache, threshold=10, top=None, prefix=None, output_format='table', sqlite_path=None):
+    """
+    Keeps the report on screen, counting new log lines as they arrive and redrawing every interval seconds
+
+    Redrawing only reads the in-memory counts, the log is never parsed twice.
+    """
+    follower = LogFollower(path, prefix)
+    # Check the log at least once a second, but no more often than the screen is redrawn
+    poll_interval = min(1.0, interval)
+    next_redraw = 0
+    try:
+        while True:
+            follower.poll()
+            now = time.monotonic()
+            if now >= next_redraw:
+                print_report(follower.counts, geoip_cache, threshold, top, prefix, follower.users, output_format, sqlite_path)
+                next_redraw = now + interval
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.close()
+
+def parse_args():
+    """
+    Parses the command line options
+    """
+    parser = argparse.ArgumentParser(description="Report IP addresses and usernames with repeated failed SSH logins")
+    parser.add_argument('log_files', nargs='*', default=[log_file], metavar='log_file',
+                        help=f"syslog files or glob patterns to scan, .gz/.bz2/.xz are decompressed (default: {log_file})")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="number of worker processes for multiple files (default: one per CPU)")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default='stream',
+                        help="scanning engine: stream reads in chunks, mmap scans the mapped file in place (default: stream)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only parse lines appended since the last run, keeping counts in the state file")
+    parser.add_argument('--state-file', default=state_file, help=f"incremental state file (default: {state_file})")
+    parser.add_argument('-f', '--follow', action='store_true',
+                        help="keep running, count new lines as they are appended and redraw the report periodically")
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help="seconds between redraws in follow mode (default: 5)")
+    parser.add_argument('-t', '--threshold', type=int, default=10,
+                        help="minimum failed attempts for an IP to be reported (default: 10)")
+    parser.add_argument('--top', type=int, default=None, metavar='K',
+                        help="only report the K IPs with the most failed attempts")
+    parser.add_argument('--aggregate', type=int, choices=(8, 16, 24), default=None, metavar='PREFIX',
+                        help="count failures per /8, /16 or /24 network instead of per IP")
+    parser.add_argument('--format', dest='output_format', choices=sorted(RENDERERS), default='table',
+                        help="output format (default: table)")
+    parser.add_argument('--sqlite', metavar='DB',
+                        help="also upsert the reported counts with first/last seen times into this SQLite database")
+    parser.add_argument('--geoip-cache', default=geoip_cache_file,
+                        help=f"file that keeps country lookups between runs (default: {geoip_cache_file})")
+    parser.add_argument('--no-geoip-cache', dest='geoip_cache', action='store_const', const=None,
+                        help="do not read or write the GeoIP cache file")
+    args = parser.parse_args()
+
+    args.log_files = expand_log_files(args.log_files)
+    if args.incremental and (len(args.log_files) != 1 or args.log_files[0].endswith(tuple(OPENERS))):
+        parser.error("--incremental works on a single uncompressed log file")
+    if args.follow and (len(args.log_files) != 1 or args.log_files[0].endswith(tuple(OPENERS))):
+        parser.error("--follow works on a single uncompressed log file")
+    if args.follow and args.incremental:
+        parser.error("--follow and --incremental cannot be used together")
+    if args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    return args
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Count the occurrences of each IP without loading the whole log into memory
+    if args.follow:
+        follow_report(args.log_files[0], args.interval, GeoIPCache(args.geoip_cache), args.threshold, args.top, args.aggregate,
+                      args.output_format, args.sqlite)
+    elif args.incremental:
+        user_counts = Counter()
+        ip_counts = count_failures_incremental(args.log_files[0], args.state_file, args.engine, user_counts)
+        # The state file keeps per-IP counts, fold them into networks only for the report
+        if args.aggregate is not None:
+            ip_counts = aggregate_counts(ip_counts, args.aggregate)
+        print_report(ip_counts, GeoIPCache(args.geoip_cache), args.threshold, args.top, args.aggregate, user_counts,
+                     args.output_format, args.sqlite)
+    else:
+        user_counts = Counter()
+        ip_counts = count_failures_many(args.log_files, args.jobs, args.engine, args.aggregate, user_counts)
+        print_report(ip_counts, GeoIPCache(args.geoip_cache), args.threshold, args.top, args.aggregate, user_counts,
+                     args.output_format, args.sqlite)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Alexander Vyzhnyuk
+# November 4, 2025
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import tempfile
+from collections import Counter
+
+import attacker_report
+from syslog_generator import generate_log, parse_size
+
+def scan_read(path):
+    """
+    The original approach: read the whole file into a str and run re.findall over it
+    """
+    with open(path, 'r') as f:
+        log_content = f.read()
+    return Counter(re.findall(r"Failed password for .* from (\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})", log_content))
+
+def count_lines(path):
+    """
+    Counts the lines of an existing log file, for logs that were not generated by this run
+    """
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b"\n") for chunk in attacker_report.read_chunks(f))
+
+def run_engine(engine, path, threshold):
+    """
+    Scans path with one engine, resolves the reported IPs, and prints the timings and peak RSS as JSON
+    """
+    start = time.perf_counter()
+    if engine == 'read':
+        counts = scan_read(path)
+    else:
+        counts = attacker_report.count_failures(path, engine=engine, users=Counter())
+    parse_seconds = time.perf_counter() - start
+
+    # Time the GeoIP enrichment of the rows the report would print, starting from an empty cache
+    start = time.perf_counter()
+    rows, _ = attacker_report.build_rows(counts, attacker_report.GeoIPCache(), threshold)
+    geoip_seconds = time.perf_counter() - start
+
+    # ru_maxrss is in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'parse_seconds': parse_seconds,
+        'geoip_seconds': geoip_seconds,
+        'peak_rss_kib': peak_rss,
+        'failures': sum(counts.values()),
+        'rows': len(rows),
+    }))
+
+def memory_size():
+    """
+    Returns the physical memory of the machine in bytes
+    """
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+def bench_log(path, size, lines, engines, threshold):
+    """
+    Runs every engine on one log and prints a row of results per engine
+    """
+    size_mb = size / 1024 ** 2
+    print(f"\nLog: {path} ({size_mb:.1f} MiB, {lines} lines)")
+    print("ENGINE\t\tSECONDS\t\tLINES/SEC\tMB/SEC\t\tPEAK RSS (MiB)\tGEOIP SECONDS\tFAILURES")
+    for engine in engines:
+        if engine == 'read' and size > memory_size() // 2:
+            # The original approach holds the whole log in memory and would take the machine down
+            print(f"{engine}\t\tskipped, log is larger than half of RAM")
+            continue
+        # Each engine runs in a fresh process so peak RSS and the GeoIP cache are not carried over
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--run-engine', engine, path,
+                                          '--threshold', str(threshold)], text=True)
+        result = json.loads(output)
+        seconds = result['parse_seconds']
+        print(f"{engine}\t\t{seconds:.2f}\t\t{lines / seconds:,.0f}\t{size_mb / seconds:.1f}\t\t"
+              f"{result['peak_rss_kib'] / 1024:.1f}\t\t{result['geoip_seconds']:.3f}\t\t{result['failures']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the attacker_report pipeline on synthetic syslogs")
+    parser.add_argument('--sizes', default='10M,1G,10G', help="comma separated log sizes to generate (default: 10M,1G,10G)")
+    parser.add_argument('--log', help="benchmark this log file instead of generating any")
+    parser.add_argument('--engines', default='read,stream,mmap', help="comma separated engines to run (default: read,stream,mmap)")
+    parser.add_argument('--attackers', type=int, default=5000, help="distinct attacker addresses in generated logs (default: 5000)")
+    parser.add_argument('--failed-ratio', type=float, default=0.2, help="share of failed login lines (default: 0.2)")
+    parser.add_argument('--ipv6-ratio', type=float, default=0.1, help="share of IPv6 attackers (default: 0.1)")
+    parser.add_argument('--threshold', type=int, default=10, help="report threshold used for the GeoIP step (default: 10)")
+    parser.add_argument('--workdir', help="directory for the generated logs (default: a temporary directory)")
+    parser.add_argument('--run-engine', nargs=2, metavar=('ENGINE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_engine:
+        run_engine(*args.run_engine, args.threshold)
+        return
+
+    engines = args.engines.split(',')
+    if args.log:
+        bench_log(args.log, os.path.getsize(args.log), count_lines(args.log), engines, args.threshold)
+        return
+
+    with tempfile.TemporaryDirectory(dir=args.workdir) as tmp_dir:
+        for size_text in args.sizes.split(','):
+            path = os.path.join(tmp_dir, f"syslog-{size_text}.log")
+            print(f"\nGenerating {size_text} synthetic log...")
+            written, lines = generate_log(path, parse_size(size_text), args.attackers, args.failed_ratio, args.ipv6_ratio)
+            bench_log(path, written, lines, engines, args.threshold)
+            # Only one log on disk at a time, 10G is already plenty
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+# Alexander Vyzhnyuk
+# November 4, 2025
+"""
+Network introspection shared by ping_test.py and system_report.py.
+
+Routes and addresses are read straight from /proc/net/route and /proc/net/fib_trie
+instead of running 'ip', and every result is cached for the life of the process.
+"""
+
+import fcntl
+import socket
+import struct
+from functools import lru_cache
+
+# Route flags from /proc/net/route
+RTF_UP = 0x0001
+RTF_GATEWAY = 0x0002
+
+# ioctls that return the IPv4 address and netmask of an interface
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891b
+
+def hex_to_ip(value):
+    """
+    Converts an address from /proc/net/route (hex, host byte order) to dotted notation
+    """
+    return socket.inet_ntoa(struct.pack('=I', int(value, 16)))
+
+def prefix_to_netmask(prefix):
+    """
+    Converts a prefix length such as 24 to a netmask such as 255.255.255.0
+    """
+    mask = (0xffffffff << (32 - prefix)) & 0xffffffff
+    return '.'.join(str((mask >> i) & 0xff) for i in [24, 16, 8, 0])
+
+def netmask_to_prefix(netmask):
+    """
+    Converts a netmask such as 255.255.255.0 to a prefix length such as 24
+    """
+    return bin(struct.unpack('!I', socket.inet_aton(netmask))[0]).count('1')
+
+@lru_cache(maxsize=None)
+def routes():
+    """
+    Returns the IPv4 routing table as a list of (iface, destination, gateway, netmask, flags, metric)
+    """
+    table = []
+    try:
+        with open('/proc/net/route', 'r') as f:
+            # Skip the column header line
+            next(f, None)
+            for line in f:
+                fields = line.split()
+                if len(fields) < 8:
+                    continue
+                table.append((fields[0], hex_to_ip(fields[1]), hex_to_ip(fields[2]), hex_to_ip(fields[7]),
+                              int(fields[3], 16), int(fields[6])))
+    except OSError:
+        pass
+    return tuple(table)
+
+@lru_cache(maxsize=None)
+def default_route():
+    """
+    Returns (gateway, interface) of the default route with the lowest metric, or (None, None) if there is none
+    """
+    defaults = [route for route in routes()
+                if route[1] == '0.0.0.0' and route[3] == '0.0.0.0' and route[4] & RTF_UP and route[4] & RTF_GATEWAY]
+    if not defaults:
+        return None, None
+    iface, _, gateway, _, _, _ = min(defaults, key=lambda route: route[5])
+    return gateway, iface
+
+def default_gateway():
+    """
+    Returns the default gateway IP address, or None if there is no default route
+    """
+    return default_route()[0]
+
+@lru_cache(maxsize=None)
+def local_addresses():
+    """
+    Returns the IPv4 addresses assigned to this machine, the "/32 host LOCAL" entries of /proc/net/fib_trie
+    """
+    addresses = set()
+    leaf = None
+    try:
+        with open('/proc/net/fib_trie', 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith('|--'):
+                    leaf = line.split()[1]
+                elif line == '/32 host LOCAL' and leaf:
+                    addresses.add(leaf)
+    except OSError:
+        pass
+    return frozenset(addresses)
+
+def ioctl_address(iface):
+    """
+    Asks the kernel for (IP address, prefix length) of iface, used when the routing table does not tell
+    """
+    request = struct.pack('256s', iface[:15].encode())
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            address = fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)
+            netmask = fcntl.ioctl(s.fileno(), SIOCGIFNETMASK, request)
+        except OSError:
+            return None, None
+    # Both come back as a struct ifreq with the sockaddr_in address at offset 20
+    return socket.inet_ntoa(address[20:24]), netmask_to_prefix(socket.inet_ntoa(netmask[20:24]))
+
+@lru_cache(maxsize=None)
+def interface_address(iface):
+    """
+    Returns (IP address, prefix length) of iface, or (None, None) if it has no IPv4 address
+
+    The address is the local address that falls inside one of the iface's directly connected routes.
+    """
+    local = [struct.unpack('!I', socket.inet_aton(address))[0] for address in local_addresses()]
+    for route_iface, destination, gateway, netmask, flags, _ in routes():
+        if route_iface != iface or flags & RTF_GATEWAY or netmask == '0.0.0.0':
+            continue
+        network = struct.unpack('!I', socket.inet_aton(destination))[0]
+        mask = struct.unpack('!I', socket.inet_aton(netmask))[0]
+        for address in local:
+            if address & mask == network:
+                return socket.inet_ntoa(struct.pack('!I', address)), netmask_to_prefix(netmask)
+    # No connected route, e.g. a /32 address, ask the kernel directly
+    return ioctl_address(iface)
+
+@lru_cache(maxsize=None)
+def nameservers():
+    """
+    Returns the nameserver addresses listed in /etc/resolv.conf
+    """
+    servers = []
+    try:
+        with open('/etc/resolv.conf', 'r') as f:
+            for line in f:
+                if line.strip().startswith('nameserver'):
+                    servers.append(line.split()[1].strip())
+    except OSError:
+        pass
+    return tuple(servers)
@@ -1,10 +1,68 @@
 #!/usr/bin/python3
 # Alexander Vyzhnyuk
 # September 1, 2025
+import os
+import sys
+import csv
+import math
+import time
+import socket
+import random
+import struct
+import asyncio
+import argparse
+import ipaddress
+import itertools
 import subprocess
+from collections import deque
+from datetime import datetime
 
-# Global variable for the gateway IP, initially set to a placeholder
-GATEWAY = "test"
+import netinfo
+
+# RIT's DNS server's IP address, used for the remote connectivity test
+REMOTE = "129.21.3.17"
+
+# Host name used for the DNS resolution test
+DNS_NAME = "www.google.com"
+
+# Seconds to wait for each probe when running all checks at once or sweeping hosts
+PROBE_TIMEOUT = 2
+
+# Number of hosts probed at the same time during a sweep
+SWEEP_CONCURRENCY = 64
+
+# Port for the UDP fallback probe, in the traceroute range where nothing normally listens
+UDP_PROBE_PORT = 33434
+
+# Ports tried with a TCP connect when ICMP is not allowed, most hosts that drop the UDP probe answer on one of these
+TCP_PROBE_PORTS = (443, 53, 80)
+
+# Sequence numbers for ICMP echo requests
+ICMP_SEQUENCE = itertools.count(1)
+
+# ICMP socket protocol, echo request type and echo reply type for each address family
+ICMP_TYPES = {
+    socket.AF_INET: (socket.IPPROTO_ICMP, 8, 0),
+    socket.AF_INET6: (socket.IPPROTO_ICMPV6, 128, 129),
+}
+
+# Seconds between probe rounds in monitor mode
+MONITOR_INTERVAL = 1.0
+
+# Number of most recent probes per target kept for the monitor statistics
+MONITOR_WINDOW = 300
+
+# Names resolved by the DNS resolver test
+DNS_TEST_NAMES = ["www.google.com", "www.rit.edu", "www.wikipedia.org", "www.github.com", "www.amazon.com"]
+
+# Port DNS servers listen on
+DNS_PORT = 53
+
+# DNS response codes worth naming in error messages
+DNS_RCODES = {1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+# Address families where the kernel refused an unprivileged ICMP socket, so it is not tried again
+ICMP_DENIED = set()
 
 def clear():
     """
@@ -15,102 +73,721 @@ def clear():
 
 def print_gw():
     """
-    Displays the default gateway IP address by running the 'ip r' command
+    Displays the default gateway IP address from the routing table
+    """
+    gateway = netinfo.default_gateway()
+    print(gateway if gateway else "No default gateway found.")
+
+def format_rtt(rtt_ns):
+    """
+    Formats a round trip time in nanoseconds as milliseconds
+    """
+    return f"{rtt_ns / 1000000:.2f} ms"
+
+def result_text(succeeded, detail, rtt_ns):
+    """
+    Returns the "Ping succeeded!"/"Ping failed!" line for a probe result
+    """
+    if succeeded:
+        return f"Ping succeeded! ({format_rtt(rtt_ns)}" + (f", {detail})" if detail else ")")
+    return "Ping failed!" + (f" ({detail})" if detail else "")
+
+def icmp_checksum(data):
+    """
+    Computes the ones' complement checksum used in ICMP headers
     """
-    command = ["ip", "r"]
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+def open_icmp_socket(family):
+    """
+    Opens an unprivileged ICMP datagram socket, or returns None if the kernel does not allow it
+
+    Linux only allows these for groups listed in net.ipv4.ping_group_range.
+    """
+    if family in ICMP_DENIED:
+        return None
     try:
-        # Execute the command to get routing information
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # Parse the output to extract the gateway IP (assuming it's the third word in the output)
-        string = result.stdout.split()
-        GATEWAY = str(string[2])
-        print(GATEWAY)
+        sock = socket.socket(family, socket.SOCK_DGRAM, ICMP_TYPES[family][0])
+    except OSError:
+        ICMP_DENIED.add(family)
+        return None
+    sock.setblocking(False)
+    return sock
 
-    except subprocess.CalledProcessError as e:
-        # Print error message if the command fails
-        print(e.stderr)
+async def resolve(host, timeout=PROBE_TIMEOUT):
+    """
+    Resolves host to (address family, address) without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    infos = await asyncio.wait_for(loop.getaddrinfo(host, None, type=socket.SOCK_DGRAM), timeout)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr[0]
 
-def local():
+async def receive_until(sock, deadline, accept):
     """
-    Tests local connectivity by pinging the default gateway once
+    Receives datagrams until accept(data) is true or the perf_counter_ns deadline passes
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        remaining = (deadline - time.perf_counter_ns()) / 1000000000
+        if remaining <= 0:
+            raise asyncio.TimeoutError
+        data = await asyncio.wait_for(loop.sock_recv(sock, 4096), remaining)
+        if accept(data):
+            return data
+
+async def icmp_probe(sock, family, host, address, timeout=PROBE_TIMEOUT):
+    """
+    Sends one ICMP echo request over an unprivileged socket and waits for the matching reply
     """
-    command = ["ping", GATEWAY, "-c", "1"]
+    loop = asyncio.get_running_loop()
+    _, request_type, reply_type = ICMP_TYPES[family]
+    sequence = next(ICMP_SEQUENCE) & 0xffff
+    payload = b"ping_test"
+    # The kernel fills in the identifier of datagram ICMP sockets, and the checksum for ICMPv6
+    header = struct.pack("!BBHHH", request_type, 0, 0, 0, sequence)
+    packet = struct.pack("!BBHHH", request_type, 0, icmp_checksum(header + payload), 0, sequence) + payload
+
+    def is_reply(data):
+        # Datagram ICMP sockets hand back the ICMP message without the IP header
+        return len(data) >= 8 and data[0] == reply_type and struct.unpack("!H", data[6:8])[0] == sequence
+
+    # Connecting a datagram socket only sets the default destination, it never blocks
+    sock.connect((address, 0))
+    start = time.perf_counter_ns()
+    await loop.sock_sendall(sock, packet)
+    await receive_until(sock, start + int(timeout * 1000000000), is_reply)
+    return host, True, "", time.perf_counter_ns() - start
+
+async def udp_probe(family, host, address, timeout=PROBE_TIMEOUT):
+    """
+    Sends an empty UDP datagram to an unused port, a port unreachable error back means the host is up
+
+    Used when ICMP sockets are not allowed. Hosts that silently drop UDP look unreachable.
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
     try:
-        # Execute the ping command
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # Check if the ping was successful by looking for '1 received' in the output
-        if ("1 received" in result.stdout):
-            print("Ping succeeded!")
-        else:
-            print("Ping failed!")
+        sock.connect((address, UDP_PROBE_PORT))
+        start = time.perf_counter_ns()
+        await loop.sock_sendall(sock, b"")
+        try:
+            await receive_until(sock, start + int(timeout * 1000000000), lambda data: True)
+        except ConnectionRefusedError:
+            # The port unreachable error came back, any answer at all means the host is up
+            pass
+        return host, True, "udp", time.perf_counter_ns() - start
+    finally:
+        sock.close()
 
-    except subprocess.CalledProcessError as e:
-        # Print error message if the command fails
-        print(e.stderr)
+async def fallback_probe(family, host, address, timeout=PROBE_TIMEOUT):
+    """
+    Probes host without ICMP, racing the UDP probe against TCP connects to TCP_PROBE_PORTS
 
-def remote():
+    The first probe that gets any answer wins, a TCP reset counts as the host being up.
     """
-    Tests remote connectivity by pinging RIT's DNS server's IP address, 129.21.3.17
+    async def udp():
+        try:
+            return await udp_probe(family, host, address, timeout)
+        except asyncio.TimeoutError:
+            return host, False, "timed out", None
+        except OSError as e:
+            return host, False, e.strerror or str(e), None
+
+    async def tcp(port):
+        _, succeeded, detail, rtt_ns = await tcp_probe(address, port, timeout)
+        return host, succeeded, f"tcp/{port}" + (f" {detail}" if detail and succeeded else ""), rtt_ns
+
+    tasks = [asyncio.ensure_future(udp())] + [asyncio.ensure_future(tcp(port)) for port in TCP_PROBE_PORTS]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            if result[1]:
+                return result
+    finally:
+        for task in tasks:
+            task.cancel()
+    # Every probe failed, report why the UDP probe did
+    return tasks[0].result()
+
+async def native_probe(host, timeout=PROBE_TIMEOUT, port=None):
+    """
+    Probes host in-process and returns (host, succeeded, detail, round trip time in ns or None)
+
+    Uses a TCP connect if a port is given, otherwise ICMP echo where the kernel allows
+    unprivileged ICMP sockets, and UDP and TCP probes where it does not.
     """
-    command = ["ping", "129.21.3.17", "-c", "1"]
     try:
-        # Execute the ping command
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # Check if the ping was successful by looking for '1 received' in the output
-        if ("1 received" in result.stdout):
-            print("Ping succeeded!")
-        else:
-            print("Ping failed!")
-        
+        if port is not None:
+            return await tcp_probe(host, port, timeout)
+        family, address = await resolve(host, timeout)
+        sock = open_icmp_socket(family)
+        if sock is None:
+            return await fallback_probe(family, host, address, timeout)
+        try:
+            return await icmp_probe(sock, family, host, address, timeout)
+        finally:
+            sock.close()
+    except asyncio.TimeoutError:
+        return host, False, "timed out", None
+    except OSError as e:
+        # Covers unknown host names as well as unreachable hosts and networks
+        return host, False, e.strerror or str(e), None
+    except ValueError as e:
+        # Malformed names such as "a..b" fail IDNA encoding with a UnicodeError
+        return host, False, f"invalid host name ({e})", None
+
+def ping_once(target):
+    """
+    Probes target once and prints whether the ping succeeded
+    """
+    _, succeeded, detail, rtt_ns = asyncio.run(native_probe(target))
+    print(result_text(succeeded, detail, rtt_ns))
+
+def local():
+    """
+    Tests local connectivity by pinging the default gateway once
+    """
+    gateway = netinfo.default_gateway()
+    if gateway:
+        ping_once(gateway)
+    else:
+        print("Ping failed! (no default gateway found)")
 
-    except subprocess.CalledProcessError as e:
-        # Print error message if the command fails
-        print(e.stderr)
+def remote():
+    """
+    Tests remote connectivity by pinging RIT's DNS server's IP address, 129.21.3.17
+    """
+    ping_once(REMOTE)
 
 def dns():
     """
     Tests DNS resolution by pinging www.google.com once
     """
-    command = ["ping", "www.google.com", "-c", "1"]
+    ping_once(DNS_NAME)
+
+async def probe(name, target, timeout=PROBE_TIMEOUT):
+    """
+    Pings target once with the native probe engine and returns (name, succeeded, detail, round trip time in ns)
+    """
+    _, succeeded, detail, rtt_ns = await native_probe(target, timeout)
+    return name, succeeded, detail, rtt_ns
+
+async def probe_all():
+    """
+    Runs the local, remote and DNS probes at the same time and prints each result as soon as it is in
+    """
+    probes = [
+        probe("Remote Connectivity", REMOTE),
+        probe("DNS Resolution", DNS_NAME),
+    ]
+    gateway = netinfo.default_gateway()
+    if gateway:
+        probes.insert(0, probe("Local Connectivity", gateway))
+    else:
+        print("Local Connectivity: Ping failed! (no default gateway found)")
+    for finished in asyncio.as_completed(probes):
+        name, succeeded, detail, rtt_ns = await finished
+        print(f"{name}: {result_text(succeeded, detail, rtt_ns)}")
+
+def all_checks():
+    """
+    Tests local, remote and DNS connectivity concurrently, so a dead network costs one timeout instead of three
+    """
+    asyncio.run(probe_all())
+
+async def tcp_probe(host, port, timeout=PROBE_TIMEOUT):
+    """
+    Tries a TCP connection to host:port and returns (host, reachable, detail, round trip time in ns)
+    """
+    start = time.perf_counter_ns()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except ConnectionRefusedError:
+        # The host answered with a reset, so it is up even though nothing listens on the port
+        return host, True, "port closed", time.perf_counter_ns() - start
+    except asyncio.TimeoutError:
+        return host, False, "timed out", None
+    except OSError as e:
+        return host, False, e.strerror or str(e), None
+    rtt_ns = time.perf_counter_ns() - start
+    writer.close()
     try:
-        # Execute the ping command
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        # Check if the ping was successful by looking for '1 received' in the output
-        if ("1 received" in result.stdout):
-            print("Ping succeeded!")
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return host, True, "", rtt_ns
+
+def sweep_targets(spec):
+    """
+    Returns the hosts to sweep from an inventory file (one host per line, # for comments) or a CIDR range
+    """
+    if os.path.isfile(spec):
+        with open(spec, 'r') as f:
+            hosts = [line.split('#')[0].strip() for line in f]
+        return [host for host in hosts if host]
+    # Not a file, so it must be a range like 10.0.0.0/22, hosts are generated as they are needed
+    return (str(host) for host in ipaddress.ip_network(spec, strict=False).hosts())
+
+async def sweep_hosts(hosts, port=None, concurrency=SWEEP_CONCURRENCY, timeout=PROBE_TIMEOUT):
+    """
+    Probes every host with ping, or a TCP connect if port is given, with at most concurrency probes in flight
+
+    Prints each result as it comes in and returns the lists of reachable and unreachable hosts.
+    """
+    hosts = iter(hosts)
+    reachable = []
+    unreachable = []
+
+    async def worker():
+        # Each worker takes the next host until there are none left, so only concurrency probes exist at once
+        for host in hosts:
+            _, succeeded, detail, rtt_ns = await native_probe(host, timeout, port)
+            if succeeded:
+                reachable.append(host)
+                print(f"{host}: reachable ({format_rtt(rtt_ns)}" + (f", {detail})" if detail else ")"))
+            else:
+                unreachable.append(host)
+                print(f"{host}: unreachable" + (f" ({detail})" if detail else ""))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return reachable, unreachable
+
+def sweep(spec, port=None, concurrency=SWEEP_CONCURRENCY, timeout=PROBE_TIMEOUT):
+    """
+    Sweeps an inventory file or CIDR range and prints a reachable/unreachable summary
+    """
+    try:
+        hosts = sweep_targets(spec)
+    except ValueError:
+        print(f"{spec} is not an inventory file or a CIDR range.")
+        return
+    reachable, unreachable = asyncio.run(sweep_hosts(hosts, port, concurrency, timeout))
+    print(f"\nReachable: {len(reachable)}  Unreachable: {len(unreachable)}")
+    if unreachable:
+        print("Unreachable hosts: " + ", ".join(sorted(unreachable)))
+
+def sweep_menu():
+    """
+    Asks for the hosts and probe type, then runs a sweep
+    """
+    spec = input("Enter an inventory file or CIDR range: ").strip()
+    port = input("Enter a TCP port to probe, or press Enter to ping: ").strip()
+    if port and not (port.isdigit() and 1 <= int(port) <= 65535):
+        print("Invalid port. Please enter a port between 1 and 65535.")
+        return
+    sweep(spec, int(port) if port else None)
+
+class RttStats(object):
+    """
+    Round trip times of the most recent probes to one target, kept in a fixed-size ring buffer.
+
+    A lost probe is stored as None, so loss and latency come from the same window.
+    """
+    def __init__(self, window=MONITOR_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.sent = 0
+
+    def add(self, rtt_ns):
+        # Record one probe, the oldest sample drops out once the window is full
+        self.samples.append(rtt_ns)
+        self.sent += 1
+
+    def summary(self):
+        # Returns loss percentage and min/avg/max/p50/p99 in ms over the window, RTTs are None if nothing came back
+        rtts = sorted(rtt for rtt in self.samples if rtt is not None)
+        loss = 100.0 * (len(self.samples) - len(rtts)) / len(self.samples) if self.samples else 0.0
+        if not rtts:
+            return loss, None, None, None, None, None
+
+        def percentile(p):
+            # Nearest-rank percentile, the smallest sample with at least p% of the samples at or below it
+            return rtts[max(0, math.ceil(len(rtts) * p / 100) - 1)] / 1000000
+
+        return loss, rtts[0] / 1000000, sum(rtts) / len(rtts) / 1000000, rtts[-1] / 1000000, percentile(50), percentile(99)
+
+def print_monitor(targets, stats):
+    """
+    Redraws the monitor table with one row of statistics per target
+    """
+    # Move to the top left and clear with escape codes, forking clear every second would be wasteful
+    print("\033[H\033[2J", end="")
+    print(f"Connectivity monitor - {datetime.now().strftime('%B %d, %Y %H:%M:%S')} (Ctrl+C to stop)\n")
+    print("TARGET".ljust(22) + "HOST".ljust(18) + "SENT".rjust(6) + "LOSS%".rjust(8)
+          + "MIN".rjust(9) + "AVG".rjust(9) + "MAX".rjust(9) + "P50".rjust(9) + "P99".rjust(9) + "  (ms)")
+    for name, host in targets:
+        loss, *rtts = stats[name].summary()
+        row = name.ljust(22) + host[:17].ljust(18) + str(stats[name].sent).rjust(6) + f"{loss:.1f}".rjust(8)
+        row += "".join(("-" if rtt is None else f"{rtt:.2f}").rjust(9) for rtt in rtts)
+        print(row)
+
+async def monitor_targets(targets, interval=MONITOR_INTERVAL, window=MONITOR_WINDOW, csv_path=None, timeout=PROBE_TIMEOUT):
+    """
+    Probes every target each interval, keeping rolling statistics and optionally appending each sample to a CSV file
+    """
+    stats = {name: RttStats(window) for name, _ in targets}
+    # A probe never takes longer than the interval, so rounds do not pile up
+    timeout = min(timeout, interval)
+    csv_file = None
+    writer = None
+    if csv_path:
+        new_file = not os.path.exists(csv_path)
+        csv_file = open(csv_path, 'a', newline='')
+        writer = csv.writer(csv_file)
+        if new_file:
+            writer.writerow(['timestamp', 'target', 'host', 'succeeded', 'rtt_ms', 'detail'])
+
+    loop = asyncio.get_running_loop()
+    next_round = loop.time()
+    try:
+        while True:
+            timestamp = datetime.now().isoformat(timespec='milliseconds')
+            results = await asyncio.gather(*(probe(name, host, timeout) for name, host in targets))
+            for (name, succeeded, detail, rtt_ns), (_, host) in zip(results, targets):
+                stats[name].add(rtt_ns if succeeded else None)
+                if writer:
+                    writer.writerow([timestamp, name, host, succeeded, f"{rtt_ns / 1000000:.3f}" if succeeded else "", detail])
+            if csv_file:
+                csv_file.flush()
+            print_monitor(targets, stats)
+            # Keep a steady rhythm instead of drifting by the time each round took
+            next_round += interval
+            await asyncio.sleep(max(0, next_round - loop.time()))
+    finally:
+        if csv_file:
+            csv_file.close()
+
+def monitor(interval=MONITOR_INTERVAL, window=MONITOR_WINDOW, csv_path=None, timeout=PROBE_TIMEOUT):
+    """
+    Monitors the gateway, remote and DNS targets until Ctrl+C is pressed
+    """
+    targets = [
+        ("Remote Connectivity", REMOTE),
+        ("DNS Resolution", DNS_NAME),
+    ]
+    # Without a default route there is no gateway to monitor
+    gateway = netinfo.default_gateway()
+    if gateway:
+        targets.insert(0, ("Local Connectivity", gateway))
+    try:
+        asyncio.run(monitor_targets(targets, interval, window, csv_path, timeout))
+    except KeyboardInterrupt:
+        print()
+
+def monitor_menu():
+    """
+    Asks for the monitor settings, then monitors until Ctrl+C is pressed
+    """
+    interval = input(f"Enter seconds between probes (default: {MONITOR_INTERVAL}): ").strip()
+    csv_path = input("Enter a CSV file to save the samples to, or press Enter to skip: ").strip()
+    try:
+        interval = float(interval) if interval else MONITOR_INTERVAL
+    except ValueError:
+        interval = 0
+    if interval <= 0:
+        print("Invalid interval. Please try again.")
+        return
+    monitor(interval, csv_path=csv_path or None)
+
+def build_dns_query(name, query_id):
+    """
+    Builds a DNS query packet asking for the A record of name, with recursion desired
+
+    Raises ValueError for names that cannot be put in a query, such as "a..b" or labels over 63 characters.
+    """
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    try:
+        labels = name.rstrip('.').encode('idna').split(b".")
+    except UnicodeError as e:
+        raise ValueError(f"invalid name ({e})")
+    if any(not label or len(label) > 63 for label in labels):
+        raise ValueError("invalid name (label empty or too long)")
+    question = b"".join(bytes([len(label)]) + label for label in labels) + b"\0"
+    # QTYPE A, QCLASS IN
+    return header + question + struct.pack("!HH", 1, 1)
+
+async def dns_query(server, name, port=DNS_PORT, timeout=PROBE_TIMEOUT):
+    """
+    Sends one A query for name straight to server over UDP and returns (round trip time in ns, error or "")
+    """
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ':' in server else socket.AF_INET
+    query_id = random.getrandbits(16)
+    try:
+        query = build_dns_query(name, query_id)
+    except ValueError as e:
+        return None, str(e)
+    sock = socket.socket(family, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        sock.connect((server, port))
+        start = time.perf_counter_ns()
+        await loop.sock_sendall(sock, query)
+        # Ignore anything that is not the answer to this query
+        response = await receive_until(sock, start + int(timeout * 1000000000),
+                                       lambda data: len(data) >= 12 and struct.unpack("!H", data[:2])[0] == query_id)
+        rtt_ns = time.perf_counter_ns() - start
+    except asyncio.TimeoutError:
+        return None, "timed out"
+    except OSError as e:
+        return None, e.strerror or str(e)
+    finally:
+        sock.close()
+    rcode = struct.unpack("!H", response[2:4])[0] & 0xf
+    if rcode:
+        return None, DNS_RCODES.get(rcode, f"rcode {rcode}")
+    return rtt_ns, ""
+
+async def time_getaddrinfo(name, timeout=PROBE_TIMEOUT):
+    """
+    Resolves name through the system resolver (getaddrinfo) and returns (time in ns, error or "")
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter_ns()
+    try:
+        await asyncio.wait_for(loop.getaddrinfo(name, None, type=socket.SOCK_STREAM), timeout)
+    except asyncio.TimeoutError:
+        return None, "timed out"
+    except OSError as e:
+        return None, e.strerror or str(e)
+    except UnicodeError as e:
+        # Malformed names such as "a..b" fail IDNA encoding
+        return None, f"invalid name ({e})"
+    return time.perf_counter_ns() - start, ""
+
+def average_ms(results):
+    """
+    Returns the average of the successful timings in ms as text, or "-" if none succeeded
+    """
+    times = [rtt_ns for rtt_ns, _ in results if rtt_ns is not None]
+    return f"{sum(times) / len(times) / 1000000:.2f}" if times else "-"
+
+async def dns_resolver_test(names, servers, port=DNS_PORT, timeout=PROBE_TIMEOUT):
+    """
+    Times every name against each nameserver and the system resolver, first cold and then warm
+
+    All names are resolved at the same time, one resolver after another so they do not skew each other.
+    The nameservers go first, the system resolver asks the same ones and would otherwise warm their
+    caches before their cold round. The second round is answered from the resolver's cache, the first
+    is only cold for names it has not looked up recently.
+    """
+    resolvers = []
+    for server in servers:
+        resolvers.append((server, lambda name, server=server: dns_query(server, name, port, timeout)))
+    resolvers.append(("system (getaddrinfo)", lambda name: time_getaddrinfo(name, timeout)))
+
+    print("RESOLVER".ljust(24) + "NAMES".rjust(6) + "FAILED".rjust(8) + "COLD AVG".rjust(10) + "WARM AVG".rjust(10) + "  (ms)")
+    failures = []
+    for label, query in resolvers:
+        cold = await asyncio.gather(*(query(name) for name in names))
+        warm = await asyncio.gather(*(query(name) for name in names))
+        failed = set()
+        for round_name, results in (("cold", cold), ("warm", warm)):
+            for name, (rtt_ns, error) in zip(names, results):
+                if rtt_ns is None:
+                    failed.add(name)
+                    failures.append((label, name, round_name, error))
+        print(label[:23].ljust(24) + str(len(names)).rjust(6) + str(len(failed)).rjust(8)
+              + average_ms(cold).rjust(10) + average_ms(warm).rjust(10))
+    if failures:
+        print()
+        for label, name, round_name, error in failures:
+            print(f"{label}: {name} failed {round_name} ({error})")
+
+def dns_test(names=None, servers=None, port=DNS_PORT, timeout=PROBE_TIMEOUT):
+    """
+    Runs the DNS resolver test, by default with DNS_TEST_NAMES against the nameservers in /etc/resolv.conf
+    """
+    asyncio.run(dns_resolver_test(names or DNS_TEST_NAMES, netinfo.nameservers() if servers is None else servers, port, timeout))
+
+class DnsStub(asyncio.DatagramProtocol):
+    """
+    A tiny DNS server for testing, it answers every query with an A record for 127.0.0.1
+    """
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        # Echo the ID and question back with one answer pointing at the question name
+        if len(data) < 12:
+            return
+        header = data[:2] + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0)
+        answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 60, 4) + socket.inet_aton("127.0.0.1")
+        self.transport.sendto(header + data[12:] + answer, addr)
+
+async def start_dns_stub(host="127.0.0.1", port=0):
+    """
+    Starts the stub DNS server and returns its transport, port 0 picks a free port
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(DnsStub, local_addr=(host, port))
+    return transport
+
+async def serve_dns_stub(port):
+    """
+    Runs the stub DNS server on 127.0.0.1 until Ctrl+C is pressed
+    """
+    transport = await start_dns_stub(port=port)
+    print(f"Stub DNS server listening on 127.0.0.1:{transport.get_extra_info('sockname')[1]}, Ctrl+C to stop")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+async def stub_dns_check(timeout=PROBE_TIMEOUT):
+    """
+    Queries a freshly started stub DNS server and returns a probe style result
+    """
+    transport = await start_dns_stub()
+    try:
+        rtt_ns, error = await dns_query("127.0.0.1", DNS_NAME, transport.get_extra_info('sockname')[1], timeout)
+    finally:
+        transport.close()
+    return "127.0.0.1", rtt_ns is not None, error, rtt_ns
+
+def dns_test_menu():
+    """
+    Asks for the names to resolve, then runs the DNS resolver test
+    """
+    names = input("Enter names to resolve separated by commas, or press Enter for the defaults: ").strip()
+    dns_test([name.strip() for name in names.split(',') if name.strip()] or None)
+
+async def loopback_self_test():
+    """
+    Runs every native probe against the loopback address and returns True if they all succeeded
+    """
+    # Something to connect to for the TCP probe
+    server = await asyncio.start_server(lambda reader, writer: writer.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    checks = [("TCP connect", tcp_probe("127.0.0.1", port))]
+    checks.append(("UDP", udp_probe(socket.AF_INET, "127.0.0.1", "127.0.0.1")))
+    checks.append(("DNS query", stub_dns_check()))
+    icmp_sock = open_icmp_socket(socket.AF_INET)
+    if icmp_sock is not None:
+        checks.append(("ICMP echo", icmp_probe(icmp_sock, socket.AF_INET, "127.0.0.1", "127.0.0.1")))
+    else:
+        print("ICMP echo: skipped, unprivileged ICMP sockets are not allowed (net.ipv4.ping_group_range)")
+
+    passed = True
+    try:
+        for name, check in checks:
+            try:
+                _, succeeded, detail, rtt_ns = await check
+            except (OSError, asyncio.TimeoutError) as e:
+                succeeded, detail, rtt_ns = False, str(e) or "timed out", None
+            passed = passed and succeeded
+            print(f"{name}: {result_text(succeeded, detail, rtt_ns)}")
+    finally:
+        if icmp_sock is not None:
+            icmp_sock.close()
+        server.close()
+        await server.wait_closed()
+    return passed
+
+def parse_args():
+    """
+    Parses the command line options, with none given the interactive menu is shown
+    """
+    parser = argparse.ArgumentParser(description="Test network connectivity")
+    parser.add_argument('--sweep', metavar='TARGETS', help="probe every host in an inventory file or CIDR range and exit")
+    parser.add_argument('--tcp', type=int, metavar='PORT', help="probe with a TCP connect to PORT instead of ping")
+    parser.add_argument('--concurrency', type=int, default=SWEEP_CONCURRENCY,
+                        help=f"hosts probed at the same time (default: {SWEEP_CONCURRENCY})")
+    parser.add_argument('--monitor', action='store_true',
+                        help="keep probing the gateway, remote and DNS targets and show rolling RTT and loss statistics")
+    parser.add_argument('--interval', type=float, default=MONITOR_INTERVAL,
+                        help=f"seconds between monitor probes (default: {MONITOR_INTERVAL})")
+    parser.add_argument('--window', type=int, default=MONITOR_WINDOW,
+                        help=f"number of recent probes per target the statistics cover (default: {MONITOR_WINDOW})")
+    parser.add_argument('--csv', metavar='FILE', help="append every monitor sample to this CSV file")
+    parser.add_argument('--dns-test', nargs='*', metavar='NAME',
+                        help="time name resolution of NAMEs (default: a few popular sites) through the system resolver "
+                             "and each nameserver, cold and warm")
+    parser.add_argument('--nameserver', action='append', metavar='ADDRESS',
+                        help="nameserver for --dns-test, can be repeated (default: the ones in /etc/resolv.conf)")
+    parser.add_argument('--dns-port', type=int, default=DNS_PORT, help=f"port the nameservers listen on (default: {DNS_PORT})")
+    parser.add_argument('--dns-stub', type=int, metavar='PORT', help="run a stub DNS server on 127.0.0.1:PORT for testing")
+    parser.add_argument('--self-test', action='store_true', help="check the native probes against the loopback address and exit")
+    parser.add_argument('--timeout', type=float, default=PROBE_TIMEOUT, help=f"seconds to wait per probe (default: {PROBE_TIMEOUT})")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.tcp is not None and not 1 <= args.tcp <= 65535:
+        parser.error("--tcp must be a port between 1 and 65535")
+    if args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+    if args.window < 1:
+        parser.error("--window must be at least 1")
+    if args.timeout <= 0:
+        parser.error("--timeout must be greater than 0")
+    return args
+
+def main():
+    """
+    Displays the menu and handles user input until the user quits
+    """
+    # Clear the screen at the start
+    clear()
+
+    # Main loop to display menu and handle user input
+    while(True):
+        # Display the menu options
+        print("\n1. Display the default gateway")
+        print("2. Test Local Connectivity")
+        print("3. Test Remote Connectivity")
+        print("4. Test DNS Resolution")
+        print("5. Run all checks at once")
+        print("6. Sweep many hosts")
+        print("7. Monitor connectivity")
+        print("8. Test DNS resolver speed")
+        print("9. Exit/quit the script\n")
+
+        # Get user input
+        option = input("Input your selection: ")
+
+        # Handle the selected option
+        if(option == "1"):
+            print_gw()
+        elif(option == "2"):
+            local()
+        elif(option == "3"):
+            remote()
+        elif(option == "4"):
+            dns()
+        elif(option == "5"):
+            all_checks()
+        elif(option == "6"):
+            sweep_menu()
+        elif(option == "7"):
+            monitor_menu()
+        elif(option == "8"):
+            dns_test_menu()
+        elif(option == "9"):
+            print("Bye bye!")
+            break
         else:
-            print("Ping failed!")
-
-    except subprocess.CalledProcessError as e:
-        # Print error message if the command fails
-        print(e.stderr)
-
-# Clear the screen at the start
-clear()
-
-# Main loop to display menu and handle user input
-while(True):
-    # Display the menu options
-    print("\n1. Display the default gateway")
-    print("2. Test Local Connectivity")
-    print("3. Test Remote Connectivity")
-    print("4. Test DNS Resolution")
-    print("5. Exit/quit the script\n")
-    
-    # Get user input
-    option = input("Input your selection: ")
-    
-    # Handle the selected option
-    if(option == "1"):
-        print_gw()
-    elif(option == "2"):
-        local()
-    elif(option == "3"):
-        remote()
-    elif(option == "4"):
-        dns()
-    elif(option == "5"):
-        print("Bye bye!")
-        break
+            print("Invalid option selected. Please try again.")
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.self_test:
+        sys.exit(0 if asyncio.run(loopback_self_test()) else 1)
+    elif args.sweep:
+        sweep(args.sweep, args.tcp, args.concurrency, args.timeout)
+    elif args.monitor:
+        monitor(args.interval, args.window, args.csv, args.timeout)
+    elif args.dns_test is not None:
+        dns_test(args.dns_test, args.nameserver, args.dns_port, args.timeout)
+    elif args.dns_stub is not None:
+        try:
+            asyncio.run(serve_dns_stub(args.dns_stub))
+        except KeyboardInterrupt:
+            print()
     else:
-        print("Invalid option selected. Please try again.")
\ No newline at end of file
+        main()
\ No newline at end of file
@@ -3,8 +3,85 @@
 # October 23, 2025
 
 import os
+import re
+import pwd
 import sys
+import csv
+import json
+import time
+import heapq
+import fnmatch
+import sqlite3
+import queue
+import argparse
+import threading
 from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+# PyYAML is only needed for YAML manifests
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+# Persistent filename index, built with --rebuild-index and brought up to date with --refresh-index
+index_file = os.path.expanduser('~/.shortcut_index.db')
+
+# Pseudo filesystems that are never searched or indexed, like updatedb's PRUNEPATHS
+PRUNE_PATHS = ('/proc', '/sys', '/dev', '/run')
+
+# Pseudo and network filesystem types whose mount points are skipped, like updatedb's PRUNEFS
+PRUNE_FSTYPES = {
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'cgroup', 'cgroup2', 'securityfs', 'debugfs', 'tracefs', 'pstore',
+    'bpf', 'mqueue', 'hugetlbfs', 'configfs', 'fusectl', 'binfmt_misc', 'autofs',
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', 'ceph', 'fuse.sshfs', '9p',
+}
+
+# Directories scanned at the same time by a search, directory reads mostly wait on the disk
+SEARCH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# How a name is matched, auto is exact unless the name has glob wildcards, falling back to fuzzy without an exact match
+MATCH_MODES = ('auto', 'exact', 'glob', 'regex', 'fuzzy')
+
+# Match scores are between 0 and 1, an exact name always scores EXACT_SCORE
+EXACT_SCORE = 1.0
+
+# Ranking adds up to RECENCY_WEIGHT for recently modified files, halving every RECENCY_HALF_LIFE seconds,
+# and takes DEPTH_WEIGHT off for every directory level
+RECENCY_WEIGHT = 0.2
+RECENCY_HALF_LIFE = 30 * 24 * 3600
+DEPTH_WEIGHT = 0.01
+
+# Number of ranked matches offered for selection
+TOP_MATCHES = 10
+
+# Manifest formats by file extension
+MANIFEST_FORMATS = {'.json': 'json', '.csv': 'csv', '.yaml': 'yaml', '.yml': 'yaml'}
+
+# Outcomes of a manifest entry, in the order they are reported
+BATCH_STATUSES = ('created', 'overwritten', 'removed', 'skipped', 'failed')
+
+# Outcomes of an audited link, in the order they are reported
+AUDIT_STATUSES = ('ok', 'chain', 'dangling', 'loop')
+
+# Links followed before giving up, the kernel's own limit
+MAX_LINK_HOPS = 40
+
+# Every directory with its mtime, and every regular file by basename, like mlocate's database
+INDEX_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS dirs (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        mtime_ns INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS files (
+        name TEXT NOT NULL,
+        dir_id INTEGER NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS files_name ON files (name)",
+    "CREATE INDEX IF NOT EXISTS files_dir ON files (dir_id)",
+)
 
 class bcolors:
     HEADER = '\033[93m'
@@ -15,14 +92,389 @@ class bcolors:
 def clear_terminal():
     os.system('clear')
 
-def find_files(filename):
-    # Search the entire filesystem for files matching the given filename
+@lru_cache(maxsize=None)
+def pruned_paths():
+    # Return PRUNE_PATHS plus every mount point of a PRUNE_FSTYPES filesystem from /proc/mounts
+    paths = set(PRUNE_PATHS)
+    try:
+        with open('/proc/mounts', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 2 and fields[2] in PRUNE_FSTYPES:
+                    # Spaces and other special characters in mount points are written as octal escapes
+                    paths.add(fields[1].encode().decode('unicode_escape'))
+    except OSError:
+        pass
+    return frozenset(paths)
+
+def scan_for_matches(path, match):
+    # Read one directory, return ((path, score) of matching files, subdirectories to descend into)
+    # The DirEntry objects carry the file type from the directory read, so no extra stat is needed per entry
     matches = []
-    for root, _, files in os.walk('/'):
-        if filename in files:
-            full_path = os.path.join(root, filename)
-            if os.path.isfile(full_path):
-                matches.append(full_path)
+    subdirs = []
+    pruned = pruned_paths()
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Symlinked directories are not followed, same as os.walk
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in pruned:
+                            subdirs.append(entry.path)
+                    else:
+                        score = match(entry.name)
+                        if score is not None and entry.is_file():
+                            matches.append((entry.path, score))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return matches, subdirs
+
+def search_files(match, roots=('/',), exclude=(), max_depth=None, workers=None):
+    # Yield (path, score) of every file whose name match scores, as soon as it is found
+    # match takes a file name and returns its score, or None if it does not match
+    # Directories are read by a pool of threads sharing one queue, a directory's subdirectories are queued as soon as it is read.
+    # roots are searched even if pruned, exclude directories are skipped along with everything below them,
+    # and max_depth limits how many levels below a root are searched
+    exclude = set(os.path.abspath(path) for path in exclude)
+    workers = workers or SEARCH_WORKERS
+    directories = queue.Queue()
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def read_directories():
+        # Worker thread, reads queued directories until it gets None
+        while True:
+            item = directories.get()
+            if item is None:
+                return
+            path, depth = item
+            try:
+                # After the caller stops, the remaining directories are only drained
+                if not stop.is_set():
+                    matches, subdirs = scan_for_matches(path, match)
+                    if max_depth is None or depth < max_depth:
+                        for subdir in subdirs:
+                            if subdir not in exclude:
+                                directories.put((subdir, depth + 1))
+                    for found in matches:
+                        results.put(found)
+            finally:
+                directories.task_done()
+
+    def finish():
+        # Once every queued directory has been read, stop the workers and tell the caller
+        directories.join()
+        for _ in range(workers):
+            directories.put(None)
+        results.put(None)
+
+    for root in roots:
+        root = os.path.abspath(root)
+        if root not in exclude:
+            directories.put((root, 0))
+    # Daemon threads, so an interrupted search never keeps the program from exiting
+    for _ in range(workers):
+        threading.Thread(target=read_directories, daemon=True).start()
+    threading.Thread(target=finish, daemon=True).start()
+
+    try:
+        while True:
+            found = results.get()
+            if found is None:
+                return
+            yield found
+    finally:
+        # Stop reading directories when the caller stops early
+        stop.set()
+
+def fuzzy_score(pattern, name):
+    # Score name for containing the letters of pattern in order, case-insensitively, or None if it does not
+    # Letters next to each other and letters starting a word count extra, and shorter names score higher
+    pattern = pattern.lower()
+    lowered = name.lower()
+    # A name containing the whole pattern is scored from where it starts
+    position = lowered.find(pattern)
+    position = position - 1 if position > 0 else -1
+    previous = -2
+    points = 0
+    for char in pattern:
+        position = lowered.find(char, position + 1)
+        if position < 0:
+            return None
+        points += 1
+        if position == previous + 1:
+            points += 2
+        if position == 0 or lowered[position - 1] in '._- ':
+            points += 2
+        previous = position
+    # A name that is all one run of the pattern's letters gets 3 points a letter, keep fuzzy matches below EXACT_SCORE
+    return 0.9 * min(1.0, points / (3 * len(pattern))) * (0.5 + 0.5 * len(pattern) / len(name))
+
+def has_wildcards(pattern):
+    # Return True if pattern contains glob wildcards
+    return any(char in pattern for char in '*?[')
+
+def name_matcher(pattern, mode='auto'):
+    # Return a function that scores a file name against pattern, or returns None if it does not match
+    # Raises ValueError for a regex mode pattern that is not a valid regular expression
+    if mode == 'auto':
+        if has_wildcards(pattern):
+            mode = 'glob'
+        else:
+            # Exact names first, anything else only as a fuzzy match
+            return lambda name: EXACT_SCORE if name == pattern else fuzzy_score(pattern, name)
+    if mode == 'exact':
+        return lambda name: EXACT_SCORE if name == pattern else None
+    if mode == 'fuzzy':
+        return lambda name: fuzzy_score(pattern, name)
+
+    if mode == 'glob':
+        regex = re.compile(fnmatch.translate(pattern))
+        # The more of the name the pattern spells out, the better the match
+        literal = len(pattern) - sum(pattern.count(char) for char in '*?')
+    else:
+        try:
+            regex = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"invalid regular expression: {e}")
+        literal = None
+    def match(name):
+        found = regex.match(name) if mode == 'glob' else regex.search(name)
+        if not found:
+            return None
+        if name == pattern:
+            return EXACT_SCORE
+        covered = literal if literal is not None else found.end() - found.start()
+        return 0.9 * max(0.1, min(covered, len(name)) / len(name))
+    return match
+
+def rank_score(path, base, now):
+    # Return the ranking of a matching file from its score less the depth penalty, None if it no longer exists
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    return base + RECENCY_WEIGHT * 0.5 ** (max(0.0, now - mtime) / RECENCY_HALF_LIFE)
+
+def rank_matches(matches, top=TOP_MATCHES):
+    # Return the paths of the top best ranked (path, score) matches, best first
+    # heapq.nlargest keeps a heap of only top entries however many files match
+    based = [(score - DEPTH_WEIGHT * path.count('/'), path) for path, score in matches]
+    # Recency adds at most RECENCY_WEIGHT, so files too far behind the top ones without it are never stat()ed
+    cutoff = None
+    if len(based) > top:
+        cutoff = heapq.nlargest(top, based)[-1][0] - RECENCY_WEIGHT
+    now = time.time()
+    ranked = ((rank_score(path, base, now), path) for base, path in based if cutoff is None or base >= cutoff)
+    return [path for rank, path in heapq.nlargest(top, (item for item in ranked if item[0] is not None))]
+
+def index_matches(pattern, mode, index_path=None):
+    # Return (path, score) of the indexed files matching pattern, or None without an index
+    if mode == 'exact':
+        # A direct lookup by name, far cheaper than scoring every indexed name
+        paths = index_lookup(index_path or index_file, pattern)
+        return None if paths is None else [(path, EXACT_SCORE) for path in paths]
+    return index_search(index_path or index_file, name_matcher(pattern, mode))
+
+def find_scored(pattern, mode, index_path=None, on_match=None, roots=('/',), exclude=(), max_depth=None, workers=None):
+    # Return (path, score) of the files matching pattern, from the index, or from a filesystem search
+    # when there is no index or nothing in it matches
+    # Checking the pattern first means an invalid regex is reported before anything is searched
+    match = name_matcher(pattern, mode)
+    if mode == 'auto' and not has_wildcards(pattern):
+        # The exact name lookup is cheap, every indexed name is only scored when it finds nothing
+        matches = index_matches(pattern, 'exact', index_path)
+        if matches == []:
+            matches = index_matches(pattern, 'fuzzy', index_path)
+    else:
+        matches = index_matches(pattern, mode, index_path)
+    matches = matches or []
+    for path, _ in matches:
+        if on_match:
+            on_match(path)
+
+    if not matches:
+        # One walk of the filesystem, in auto mode it scores exact and fuzzy names together
+        for path, score in search_files(match, roots, exclude, max_depth, workers):
+            matches.append((path, score))
+            if on_match:
+                on_match(path)
+    return matches
+
+def find_files(pattern, index_path=None, on_match=None, mode='exact', top=TOP_MATCHES,
+               roots=('/',), exclude=(), max_depth=None, workers=None):
+    # Return the top best ranked files matching pattern, looking in the index first and
+    # searching the filesystem only without an index or when nothing in it matches
+    # on_match is called with each path as soon as it is found
+    # In auto mode exact names win, fuzzy matches are only kept when there is no exact one
+    # Files created since the index was built are found after --refresh-index
+    matches = find_scored(pattern, mode, index_path, on_match, roots, exclude, max_depth, workers)
+    if mode == 'auto':
+        exact = [(path, score) for path, score in matches if score == EXACT_SCORE]
+        if exact:
+            matches = exact
+    return rank_matches(matches, top)
+
+def open_index(path):
+    # Open the index database, creating the tables if needed
+    db = sqlite3.connect(path)
+    for statement in INDEX_SCHEMA:
+        db.execute(statement)
+    return db
+
+def scan_directory(path):
+    # Return (mtime_ns, file names, subdirectory paths) of one directory, or None if it cannot be read
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    # Symlinked directories are not followed, same as os.walk
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.path not in pruned_paths():
+                            subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return mtime_ns, files, subdirs
+
+def store_directory(db, path, mtime_ns, files):
+    # Replace the index entry of one directory and its files
+    row = db.execute("SELECT id FROM dirs WHERE path = ?", (path,)).fetchone()
+    if row:
+        dir_id = row[0]
+        db.execute("UPDATE dirs SET mtime_ns = ? WHERE id = ?", (mtime_ns, dir_id))
+        db.execute("DELETE FROM files WHERE dir_id = ?", (dir_id,))
+    else:
+        dir_id = db.execute("INSERT INTO dirs (path, mtime_ns) VALUES (?, ?)", (path, mtime_ns)).lastrowid
+    db.executemany("INSERT INTO files (name, dir_id) VALUES (?, ?)", ((name, dir_id) for name in files))
+
+def index_tree(db, root):
+    # Add root and everything below it to the index, returns the number of directories added
+    added = 0
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        scanned = scan_directory(path)
+        if scanned is None:
+            continue
+        mtime_ns, files, subdirs = scanned
+        store_directory(db, path, mtime_ns, files)
+        stack.extend(subdirs)
+        added += 1
+    return added
+
+def rebuild_index(path, roots=('/',)):
+    # Build a new index from scratch, replacing the old one only once it is complete
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = open_index(tmp_path)
+    try:
+        with db:
+            added = sum(index_tree(db, root) for root in roots)
+    finally:
+        db.close()
+    os.replace(tmp_path, path)
+    return added
+
+def refresh_index(path):
+    # Bring the index up to date, only rescanning directories whose mtime changed since they were indexed
+    # A directory's mtime changes whenever an entry is created, removed or renamed in it,
+    # so unchanged directories are skipped without being read
+    db = open_index(path)
+    rescanned = 0
+    added = 0
+    removed = 0
+    try:
+        with db:
+            dirs = db.execute("SELECT id, path, mtime_ns FROM dirs").fetchall()
+            known = set(dir_path for _, dir_path, _ in dirs)
+            for dir_id, dir_path, mtime_ns in dirs:
+                try:
+                    current = os.stat(dir_path).st_mtime_ns
+                except OSError:
+                    current = None
+                if current == mtime_ns:
+                    continue
+                scanned = scan_directory(dir_path) if current is not None else None
+                if scanned is None:
+                    # Gone, its subdirectories are gone too and are removed when they come up
+                    db.execute("DELETE FROM files WHERE dir_id = ?", (dir_id,))
+                    db.execute("DELETE FROM dirs WHERE id = ?", (dir_id,))
+                    removed += 1
+                    continue
+                mtime_ns, files, subdirs = scanned
+                store_directory(db, dir_path, mtime_ns, files)
+                rescanned += 1
+                # New or renamed subdirectories are indexed in full
+                for subdir in subdirs:
+                    if subdir not in known:
+                        added += index_tree(db, subdir)
+    finally:
+        db.close()
+    return rescanned, added, removed
+
+def index_lookup(path, filename):
+    # Return the indexed paths of files named filename that still exist, or None without an index
+    found = index_lookup_many(path, [filename])
+    if found is None:
+        return None
+    return found.get(filename, [])
+
+def index_lookup_many(path, filenames):
+    # Return a dict of file name to the indexed paths of files with that name that still exist, or None without an index
+    # All names are looked up over one connection, a few hundred per query to stay under SQLite's parameter limit
+    if not os.path.exists(path):
+        return None
+    filenames = sorted(set(filenames))
+    rows = []
+    db = sqlite3.connect(path)
+    try:
+        for start in range(0, len(filenames), 500):
+            chunk = filenames[start:start + 500]
+            rows.extend(db.execute("SELECT files.name, dirs.path FROM files JOIN dirs ON dirs.id = files.dir_id "
+                                   f"WHERE files.name IN ({', '.join('?' * len(chunk))}) ORDER BY dirs.path", chunk))
+    except sqlite3.Error:
+        return None
+    finally:
+        db.close()
+    # The index can be older than the filesystem, drop files that were removed since
+    matches = {}
+    for filename, dir_path in rows:
+        full_path = os.path.join(dir_path, filename)
+        if os.path.isfile(full_path):
+            matches.setdefault(filename, []).append(full_path)
+    return matches
+
+def index_search(path, match):
+    # Return (path, score) of the indexed files whose name match scores, or None without an index
+    # Every distinct name is scored once, then only the matching names are looked up
+    if not os.path.exists(path):
+        return None
+    db = sqlite3.connect(path)
+    try:
+        scores = {}
+        for (name,) in db.execute("SELECT DISTINCT name FROM files"):
+            score = match(name)
+            if score is not None:
+                scores[name] = score
+        matches = []
+        for name, score in scores.items():
+            for (dir_path,) in db.execute("SELECT dirs.path FROM files JOIN dirs ON dirs.id = files.dir_id WHERE files.name = ?",
+                                          (name,)):
+                matches.append((os.path.join(dir_path, name), score))
+    except sqlite3.Error:
+        return None
+    finally:
+        db.close()
     return matches
 
 def list_symlinks(directory):
@@ -42,34 +494,62 @@ def display_links(home_str, directory, show_remove_option=False):
     if symlinks:
         print()
         print(f"{bcolors.HEADER}Symbolic Link{bcolors.RESET}".ljust(20) + f"{bcolors.HEADER}        Target Path{bcolors.RESET}")
-        # Iterate through each link that is found
+        # Iterate through each link that is found, marking links whose target is gone
         for link_name, target in sorted(symlinks):
-            print(link_name.ljust(20) + target)
+            status = resolve_link(str(directory / link_name))['status']
+            if status in ('dangling', 'loop'):
+                print(link_name.ljust(20) + target + f" {bcolors.FAIL}({status}){bcolors.RESET}")
+            else:
+                print(link_name.ljust(20) + target)
     print()
     if show_remove_option:
         print("To return to the Main Menu, press Enter. Or select R/r to remove a link.")
     else:
         print("To return to the Main Menu, press Enter.")
 
-def create_symlink(home_dir):
-    # Prompt user for filename to create symlink for
-    filename = input("Enter the name of the file you want to create a symbolic link for: ").strip()
-    if not filename:
-        # Catch if nothing was entered
-        print(f"{bcolors.FAIL}Invalid input. Please enter a file name.{bcolors.RESET}")
-        input("Press Enter to continue...")
-        return
+def create_symlink(home_dir, index_path=None, search_options=None):
+    search_options = dict(search_options or {})
+    top = search_options.pop('top', TOP_MATCHES)
+    mode = search_options.pop('mode', 'auto')
 
-    matches = find_files(filename)
+    # Prompt user for filename to create symlink for, or a glob, regex or partial name depending on the match mode
+    while True:
+        filename = input("Enter the name of the file you want to create a symbolic link for: ").strip()
+        if not filename:
+            # Catch if nothing was entered
+            print(f"{bcolors.FAIL}Invalid input. Please enter a file name.{bcolors.RESET}")
+            input("Press Enter to continue...")
+            return
+        try:
+            match = name_matcher(filename, mode)
+            break
+        except ValueError as e:
+            # Catch a pattern that is not a valid regular expression
+            print(f"{bcolors.FAIL}{e}. Please try again.{bcolors.RESET}")
+
+    # Show the first files as soon as they are found, Ctrl-C stops the search and keeps what was found so far
+    print(f"Searching for \"{filename}\", press Ctrl-C to stop searching...")
+    found = []
+    def show_match(path):
+        found.append((path, match(os.path.basename(path))))
+        if len(found) <= top:
+            print(f"  {path}")
+    try:
+        matches = find_files(filename, index_path, show_match, mode, top, **search_options)
+    except KeyboardInterrupt:
+        print("Search stopped.")
+        if mode == 'auto' and any(score == EXACT_SCORE for _, score in found):
+            found = [(path, score) for path, score in found if score == EXACT_SCORE]
+        matches = rank_matches(found, top)
     if not matches:
         # Catch if file entered doesn't exist
         print(f"{bcolors.FAIL}Error: The file does not exist. Please check the file name and try again.{bcolors.RESET}")
         input("Press Enter to continue...")
         return
 
-    if len(matches) > 1:
-        # Handle multiple matches by displaying options and getting user selection
-        print(f"Multiple files with the name \"{filename}\" were found:")
+    if len(matches) > 1 or os.path.basename(matches[0]) != filename:
+        # Handle multiple or partial matches by displaying the best ones and getting user selection
+        print(f"Best matches for \"{filename}\" ({len(found)} found):")
         # Iterate and print matches
         for i, path in enumerate(matches, 1):
             print(f"[{i}] {path}")
@@ -88,9 +568,10 @@ def create_symlink(home_dir):
     else:
         target = matches[0]
 
-    # Ask for symlink name, default to filename
-    link_name_input = input(f"Enter the name for the shortcut (default: {filename}): ").strip()
-    link_name = link_name_input if link_name_input else filename
+    # Ask for symlink name, default to the selected file's name
+    default_name = os.path.basename(target)
+    link_name_input = input(f"Enter the name for the shortcut (default: {default_name}): ").strip()
+    link_name = link_name_input if link_name_input else default_name
     link_path = home_dir / link_name
 
     if link_path.exists():
@@ -161,17 +642,361 @@ def generate_report(home_str, home_dir):
     display_links(home_str, home_dir)
     input()     # Wait for user to press Enter to return to menu
 
+def link_directory():
+    # Return the Desktop directory if there is one, otherwise the home directory
+    desktop = Path.home() / "Desktop"
+    if os.path.isdir(desktop):
+        return desktop
+    return Path.home()
+
+def parse_flag(value):
+    # Read a yes/no manifest value, which is a string in CSV files
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'y', 'yes', 'true')
+    return bool(value)
+
+def load_manifest(path, manifest_format=None):
+    # Read a manifest of links, a list of entries with a link name and either a target path or a file name to find
+    # Entries can also have action (create or remove) and overwrite, a JSON or YAML mapping of link name to
+    # target path or file name is accepted as well
+    manifest_format = manifest_format or MANIFEST_FORMATS.get(os.path.splitext(path)[1].lower(), 'json')
+    if manifest_format == 'yaml' and yaml is None:
+        raise ValueError("YAML manifests need PyYAML, install it or use a JSON or CSV manifest")
+    with open(path, 'r', newline='') as f:
+        # Parse errors of every format are reported as ValueError, like json's own
+        try:
+            if manifest_format == 'csv':
+                data = list(csv.DictReader(f))
+            elif manifest_format == 'yaml':
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        except csv.Error as e:
+            raise ValueError(f"bad CSV: {e}")
+        except yaml.YAMLError if yaml else () as e:
+            raise ValueError(f"bad YAML: {e}")
+
+    if isinstance(data, dict):
+        # A value with a slash is a target path, anything else a file name to find
+        data = [{'name': name, ('target' if '/' in str(value) else 'file'): value} for name, value in data.items()]
+    if not isinstance(data, list):
+        raise ValueError("the manifest must be a list of links or a mapping of link name to target")
+
+    entries = []
+    for number, item in enumerate(data, 1):
+        if not isinstance(item, dict):
+            raise ValueError(f"entry {number} is not a mapping")
+        # Empty CSV cells count as missing
+        item = {key: value for key, value in item.items() if key and value not in (None, '')}
+        action = str(item.get('action', 'create')).strip().lower()
+        if action not in ('create', 'remove'):
+            raise ValueError(f"entry {number} has unknown action {action!r}, use create or remove")
+        if not item.get('name'):
+            raise ValueError(f"entry {number} has no name")
+        if action == 'create' and bool(item.get('target')) == bool(item.get('file')):
+            raise ValueError(f"entry {number} needs either a target or a file")
+        entries.append({
+            'name': str(item['name']).strip(),
+            'action': action,
+            'target': os.path.abspath(os.path.expanduser(str(item['target']))) if item.get('target') else None,
+            'file': str(item['file']).strip() if item.get('file') else None,
+            'overwrite': parse_flag(item['overwrite']) if 'overwrite' in item else None,
+        })
+    return entries
+
+def resolve_files(filenames, index_path=None, roots=('/',), exclude=(), max_depth=None, workers=None):
+    # Find every file name at once, returns a dict of file name to its best ranked path or None if not found
+    # Names in the index are looked up, all the others are found in one search of the filesystem
+    indexed = index_lookup_many(index_path or index_file, filenames) or {}
+    candidates = {filename: [(path, EXACT_SCORE) for path in paths] for filename, paths in indexed.items()}
+    missing = set(filenames) - set(candidates)
+    if missing:
+        for path, score in search_files(lambda name: EXACT_SCORE if name in missing else None,
+                                        roots, exclude, max_depth, workers):
+            candidates.setdefault(os.path.basename(path), []).append((path, score))
+    resolved = {}
+    for filename in set(filenames):
+        best = rank_matches(candidates.get(filename, ()), 1)
+        resolved[filename] = best[0] if best else None
+    return resolved
+
+def replace_link(target, link_path):
+    # Point link_path at target in one step, through a temporary link renamed over it
+    # os.replace is atomic, so the link is never missing or half made while it changes
+    tmp_path = link_path.with_name(f".{link_path.name}.{os.getpid()}.tmp")
+    os.symlink(target, tmp_path)
+    try:
+        os.replace(tmp_path, link_path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+def apply_entry(directory, entry, target, overwrite=False):
+    # Create or remove the link of one manifest entry, returns what happened as a report record
+    record = {'name': entry['name'], 'action': entry['action'], 'target': target}
+    name = entry['name']
+    if '/' in name or name in ('.', '..'):
+        return dict(record, status='failed', reason="link name must not contain /")
+    link_path = directory / name
+    is_link = link_path.is_symlink()
+
+    try:
+        if entry['action'] == 'remove':
+            if not is_link:
+                reason = "not a symlink" if os.path.lexists(link_path) else "no such link"
+                return dict(record, status='skipped', reason=reason)
+            record['target'] = os.readlink(link_path)
+            os.remove(link_path)
+            return dict(record, status='removed')
+
+        if target is None:
+            return dict(record, status='failed', reason=f"file {entry['file']} not found")
+        if not os.path.exists(target):
+            return dict(record, status='failed', reason="target does not exist")
+        if os.path.lexists(link_path):
+            if not is_link:
+                return dict(record, status='skipped', reason="existing file is not a symlink")
+            if os.readlink(link_path) == target:
+                return dict(record, status='skipped', reason="already links to the target")
+            if not (overwrite if entry['overwrite'] is None else entry['overwrite']):
+                return dict(record, status='skipped', reason=f"already links to {os.readlink(link_path)}")
+            replace_link(target, link_path)
+            return dict(record, status='overwritten')
+        replace_link(target, link_path)
+        return dict(record, status='created')
+    except OSError as e:
+        return dict(record, status='failed', reason=str(e))
+
+def run_batch(entries, directory, index_path=None, overwrite=False, search_options=None):
+    # Apply every manifest entry in order and return the report records
+    search_options = dict(search_options or {})
+    # Ranking options of the interactive search do not apply, names are always matched exactly
+    search_options.pop('mode', None)
+    search_options.pop('top', None)
+    filenames = [entry['file'] for entry in entries if entry['action'] == 'create' and entry['file']]
+    resolved = resolve_files(filenames, index_path, **search_options) if filenames else {}
+    return [apply_entry(directory, entry, entry['target'] or resolved.get(entry['file']), overwrite)
+            for entry in entries]
+
+def print_batch_report(records, output_format='table'):
+    # Print what happened to every link, as a table or one JSON document with a summary
+    summary = {status: sum(1 for record in records if record['status'] == status) for status in BATCH_STATUSES}
+    if output_format == 'json':
+        json.dump({'summary': summary, 'links': records}, sys.stdout, indent=2)
+        print()
+        return
+    colors = {'created': bcolors.GREEN, 'overwritten': bcolors.GREEN, 'removed': bcolors.GREEN,
+              'skipped': bcolors.HEADER, 'failed': bcolors.FAIL}
+    print(f"{bcolors.HEADER}STATUS\t\tLINK\t\t\tTARGET{bcolors.RESET}")
+    for record in records:
+        detail = record['target'] or ''
+        if record.get('reason'):
+            detail = f"{detail} ({record['reason']})" if detail else record['reason']
+        print(f"{colors[record['status']]}{record['status']}{bcolors.RESET}\t\t{record['name'].ljust(20)}\t{detail}")
+    print()
+    print(", ".join(f"{count} {status}" for status, count in summary.items()))
+
+# Links in different homes mostly point into the same few directories, so the real path of each
+# target directory is worked out once and shared by every link under it
+cached_realpath = lru_cache(maxsize=None)(os.path.realpath)
+
+def resolve_link(link_path):
+    # Follow a symbolic link hop by hop, returns its target, final path, the links passed through and a status:
+    # ok, chain (reaches a file through more links), dangling (ends at nothing) or loop
+    chain = []
+    seen = set()
+    path = link_path
+    status = 'ok'
+    while True:
+        try:
+            target = os.readlink(path)
+        except OSError:
+            # Not a link any more, this is where the chain ends
+            if not os.path.exists(path):
+                status = 'dangling'
+            break
+        if path in seen or len(chain) >= MAX_LINK_HOPS:
+            status = 'loop'
+            break
+        seen.add(path)
+        chain.append(path)
+        # Only the last part can be another link to follow, the directories above it are resolved from the cache
+        parent, name = os.path.split(os.path.join(os.path.dirname(path), target))
+        path = os.path.join(cached_realpath(parent), name)
+    if status == 'ok' and len(chain) > 1:
+        status = 'chain'
+    return {
+        'link': link_path,
+        'target': os.readlink(link_path),
+        'resolved': path,
+        'hops': len(chain),
+        'chain': chain[1:],
+        'status': status,
+    }
+
+def home_directories():
+    # Return the existing home directories of root and regular users, from the password database
+    homes = set()
+    for user in pwd.getpwall():
+        if (user.pw_uid == 0 or user.pw_uid >= 1000) and os.path.isdir(user.pw_dir) and user.pw_dir != '/':
+            homes.add(user.pw_dir)
+    return sorted(homes)
+
+def audit_directory(directory):
+    # Resolve every symbolic link directly in directory, returns one record per link
+    records = []
+    try:
+        with os.scandir(directory) as entries:
+            links = sorted(entry.path for entry in entries if entry.is_symlink())
+    except OSError:
+        return records
+    for link in links:
+        try:
+            records.append(dict(resolve_link(link), directory=directory))
+        except OSError:
+            # Removed while being audited
+            continue
+    return records
+
+def audit_links(directories=None, workers=None):
+    # Audit the links of many directories at once, each home directory and its Desktop by default
+    # Returns the records of every link, in directory order
+    if not directories:
+        directories = []
+        for home in home_directories():
+            directories.append(home)
+            if os.path.isdir(os.path.join(home, 'Desktop')):
+                directories.append(os.path.join(home, 'Desktop'))
+    directories = [os.path.abspath(directory) for directory in directories]
+    records = []
+    with ThreadPoolExecutor(max_workers=workers or SEARCH_WORKERS) as pool:
+        for directory_records in pool.map(audit_directory, directories):
+            records.extend(directory_records)
+    return records
+
+def print_audit_report(records, output_format='table', problems_only=False):
+    # Print every audited link, or only the broken and chained ones, as a table or one JSON document with a summary
+    summary = {status: sum(1 for record in records if record['status'] == status) for status in AUDIT_STATUSES}
+    if problems_only:
+        records = [record for record in records if record['status'] != 'ok']
+    if output_format == 'json':
+        json.dump({'summary': summary, 'links': records}, sys.stdout, indent=2)
+        print()
+        return
+    colors = {'ok': bcolors.GREEN, 'chain': bcolors.HEADER, 'dangling': bcolors.FAIL, 'loop': bcolors.FAIL}
+    print(f"{bcolors.HEADER}STATUS\t\tLINK\t\t\t\tTARGET{bcolors.RESET}")
+    for record in records:
+        detail = record['target']
+        if record['status'] == 'chain':
+            detail = " -> ".join([record['target']] + record['chain'][1:] + [record['resolved']])
+        elif record['status'] == 'dangling' and record['resolved'] != record['target']:
+            detail = f"{record['target']} (missing {record['resolved']})"
+        print(f"{colors[record['status']]}{record['status']}{bcolors.RESET}\t\t{record['link'].ljust(30)}\t{detail}")
+    print()
+    print(", ".join(f"{count} {status}" for status, count in summary.items()))
+
+def parse_args():
+    # Parse the command line options
+    parser = argparse.ArgumentParser(description="Create, remove and report shortcuts in your Desktop or home directory")
+    parser.add_argument('--index', default=index_file, metavar='FILE',
+                        help=f"filename index used to find files (default: {index_file})")
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help="build the filename index from scratch and exit")
+    parser.add_argument('--refresh-index', action='store_true',
+                        help="rescan only the directories that changed since the index was built and exit")
+    parser.add_argument('--index-root', action='append', default=None, metavar='DIR',
+                        help="directory to index with --rebuild-index, can be repeated (default: /)")
+    parser.add_argument('--search-root', action='append', default=None, metavar='DIR',
+                        help="directory to search when a file is not in the index, can be repeated (default: /)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='DIR',
+                        help="directory to leave out of searches, can be repeated")
+    parser.add_argument('--max-depth', type=int, default=None,
+                        help="search at most this many directory levels below each search root")
+    parser.add_argument('--match', choices=MATCH_MODES, default='auto',
+                        help="how file names are matched: exact, glob, regex or fuzzy, auto uses glob for names with "
+                             "wildcards and exact names otherwise, falling back to fuzzy (default: auto)")
+    parser.add_argument('--top', type=int, default=TOP_MATCHES,
+                        help=f"number of best ranked matches offered for selection (default: {TOP_MATCHES})")
+    parser.add_argument('--workers', type=int, default=SEARCH_WORKERS,
+                        help=f"directories read at the same time when searching (default: {SEARCH_WORKERS})")
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help="create and remove the links listed in a JSON, CSV or YAML manifest without prompting")
+    parser.add_argument('--manifest-format', choices=sorted(set(MANIFEST_FORMATS.values())), default=None,
+                        help="manifest format (default: from the file extension)")
+    parser.add_argument('--dir', default=None,
+                        help="directory the batch links are made in (default: Desktop if it exists, otherwise home)")
+    parser.add_argument('--overwrite', action='store_true',
+                        help="let batch links replace existing links that point elsewhere, unless the entry says otherwise")
+    parser.add_argument('--report-format', choices=('table', 'json'), default='table',
+                        help="batch and audit report format (default: table)")
+    parser.add_argument('--audit', nargs='*', default=None, metavar='DIR',
+                        help="report dangling, chained and looping links in these directories "
+                             "(default: every home directory and its Desktop)")
+    parser.add_argument('--problems-only', action='store_true',
+                        help="only list the links the audit flags")
+    args = parser.parse_args()
+    if args.rebuild_index and args.refresh_index:
+        parser.error("--rebuild-index and --refresh-index cannot be used together")
+    if args.index_root and not args.rebuild_index:
+        parser.error("--index-root only applies to --rebuild-index")
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error("--max-depth must be at least 0")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+    if (args.dir or args.overwrite or args.manifest_format) and not args.batch:
+        parser.error("--dir, --overwrite and --manifest-format only apply to --batch")
+    if args.batch and args.audit is not None:
+        parser.error("--batch and --audit cannot be used together")
+    if args.problems_only and args.audit is None:
+        parser.error("--problems-only only applies to --audit")
+    if args.dir and not os.path.isdir(args.dir):
+        parser.error(f"--dir {args.dir} is not a directory")
+    args.search_options = {
+        'mode': args.match,
+        'top': args.top,
+        'roots': args.search_root or ['/'],
+        'exclude': args.exclude,
+        'max_depth': args.max_depth,
+        'workers': args.workers,
+    }
+    return args
+
 def main():
-    # Set home_dir to desktop
-    home_dir = Path.home() / "Desktop"
-    home_str = str(home_dir)
+    args = parse_args()
 
-    # Check if the desktop directory exists, otherwise place all links in home
-    if os.path.isdir(home_str):
-        pass
-    else:
-        home_dir = Path.home()
-        home_str = str(home_dir)
+    if args.rebuild_index:
+        roots = [os.path.abspath(root) for root in args.index_root or ['/']]
+        added = rebuild_index(args.index, roots)
+        print(f"{bcolors.GREEN}Indexed {added} directories into {args.index}.{bcolors.RESET}")
+        sys.exit(0)
+    if args.refresh_index:
+        if not os.path.exists(args.index):
+            print(f"{bcolors.FAIL}No index at {args.index}, run with --rebuild-index first.{bcolors.RESET}")
+            sys.exit(1)
+        rescanned, added, removed = refresh_index(args.index)
+        print(f"{bcolors.GREEN}Rescanned {rescanned} changed directories, added {added} and removed {removed}.{bcolors.RESET}")
+        sys.exit(0)
+    if args.batch:
+        try:
+            entries = load_manifest(args.batch, args.manifest_format)
+        except (OSError, ValueError) as e:
+            print(f"{bcolors.FAIL}Cannot read manifest {args.batch}: {e}{bcolors.RESET}", file=sys.stderr)
+            sys.exit(2)
+        directory = Path(args.dir) if args.dir else link_directory()
+        records = run_batch(entries, directory, args.index, args.overwrite, args.search_options)
+        print_batch_report(records, args.report_format)
+        sys.exit(1 if any(record['status'] == 'failed' for record in records) else 0)
+
+    if args.audit is not None:
+        records = audit_links(args.audit, args.workers)
+        print_audit_report(records, args.report_format, args.problems_only)
+        sys.exit(1 if any(record['status'] in ('dangling', 'loop') for record in records) else 0)
+
+    # Set home_dir to desktop, or home if there is no Desktop directory
+    home_dir = link_directory()
+    home_str = str(home_dir)
 
     while True:
         clear_terminal()
@@ -188,7 +1013,7 @@ def main():
         try:
             option = int(choice)
             if option == 1:
-                create_symlink(home_dir)
+                create_symlink(home_dir, args.index, args.search_options)
             elif option == 2:
                 remove_symlink(home_str, home_dir)
             elif option == 3:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# Alexander Vyzhnyuk
+# November 4, 2025
+
+import random
+import argparse
+
+# Building every line of a 10 GB log one by one takes longer than parsing it, so the log is
+# made of this many distinct blocks written in a seeded random order
+BLOCK_COUNT = 16
+BLOCK_SIZE = 1024 * 1024
+
+USERS = ['root', 'admin', 'ubuntu', 'student', 'oracle', 'postgres', 'test', 'git', 'pi', 'user']
+
+NORMAL_LINES = [
+    "CRON[{pid}]: pam_unix(cron:session): session opened for user root(uid=0) by (uid=0)",
+    "CRON[{pid}]: pam_unix(cron:session): session closed for user root",
+    "systemd[1]: Started Session {pid} of User student.",
+    "kernel: [{pid}.000000] IPv4: martian source 10.0.0.255 from 10.0.0.1, on dev eth0",
+    "sshd[{pid}]: Accepted publickey for student from 10.0.0.5 port {port} ssh2",
+    "sshd[{pid}]: Connection closed by 10.0.0.5 port {port}",
+]
+
+FAILED_LINES = [
+    "sshd[{pid}]: Failed password for {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Failed password for invalid user {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Invalid user {user} from {ip} port {port}",
+    "sshd[{pid}]: pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 tty=ssh ruser= rhost={ip}  user={user}",
+]
+
+def attacker_ips(rng, attackers, ipv6_ratio):
+    """
+    Returns the attacker addresses, ipv6_ratio of them IPv6
+    """
+    ips = []
+    for _ in range(attackers):
+        if rng.random() < ipv6_ratio:
+            ips.append("2001:db8:" + ":".join(f"{rng.randint(0, 0xffff):x}" for _ in range(6)))
+        else:
+            ips.append(f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}")
+    return ips
+
+def build_block(rng, ips, weights, failed_ratio):
+    """
+    Builds one block of roughly BLOCK_SIZE bytes of syslog lines, returns the bytes and the number of lines
+    """
+    lines = []
+    size = 0
+    while size < BLOCK_SIZE:
+        fields = {'pid': rng.randint(1000, 65000), 'port': rng.randint(1024, 65535)}
+        if rng.random() < failed_ratio:
+            fields['ip'] = rng.choices(ips, cum_weights=weights)[0]
+            fields['user'] = rng.choice(USERS)
+            message = rng.choice(FAILED_LINES).format(**fields)
+        else:
+            message = rng.choice(NORMAL_LINES).format(**fields)
+        line = f"Nov  4 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} server {message}\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines).encode('ascii'), len(lines)
+
+def generate_log(path, size, attackers=500, failed_ratio=0.2, ipv6_ratio=0.1, seed=1):
+    """
+    Writes a deterministic synthetic syslog of at least size bytes and returns (bytes, lines) written
+
+    attackers is the number of distinct source addresses, a few of which do most of the attempts.
+    failed_ratio is the share of lines that are failed logins, ipv6_ratio the share of IPv6 attackers.
+    The same arguments always produce the same file.
+    """
+    rng = random.Random(seed)
+    ips = attacker_ips(rng, attackers, ipv6_ratio)
+    # Zipf-like weights, the first attacker is twice as busy as the second and so on
+    weights = []
+    total = 0.0
+    for rank in range(1, attackers + 1):
+        total += 1.0 / rank
+        weights.append(total)
+    blocks = [build_block(rng, ips, weights, failed_ratio) for _ in range(BLOCK_COUNT)]
+
+    written = 0
+    lines = 0
+    with open(path, 'wb') as f:
+        while written < size:
+            block, block_lines = rng.choice(blocks)
+            f.write(block)
+            written += len(block)
+            lines += block_lines
+    return written, lines
+
+def parse_size(text):
+    """
+    Parses sizes like 10M, 1G or 512K into bytes
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper().rstrip('B')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic syslog for testing attacker_report")
+    parser.add_argument('path', help="file to write")
+    parser.add_argument('--size', type=parse_size, default=parse_size('10M'), help="size of the log, e.g. 10M or 1G (default: 10M)")
+    parser.add_argument('--attackers', type=int, default=500, help="number of distinct attacker addresses (default: 500)")
+    parser.add_argument('--failed-ratio', type=float, default=0.2, help="share of lines that are failed logins (default: 0.2)")
+    parser.add_argument('--ipv6-ratio', type=float, default=0.1, help="share of attackers with IPv6 addresses (default: 0.1)")
+    parser.add_argument('--seed', type=int, default=1, help="random seed (default: 1)")
+    args = parser.parse_args()
+    if args.attackers < 1:
+        parser.error("--attackers must be at least 1")
+    if not 0 <= args.failed_ratio <= 1 or not 0 <= args.ipv6_ratio <= 1:
+        parser.error("--failed-ratio and --ipv6-ratio must be between 0 and 1")
+
+    written, lines = generate_log(args.path, args.size, args.attackers, args.failed_ratio, args.ipv6_ratio, args.seed)
+    print(f"Wrote {lines} lines ({written / 1024 ** 2:.1f} MiB) to {args.path}")
+
+if __name__ == "__main__":
+    main()
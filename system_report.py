@@ -7,7 +7,13 @@ import datetime
 import os
 import subprocess
 import sys
-import re
+import json
+import time
+import argparse
+import resource
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import netinfo
 
 # Colors
 RED = '\033[31m'
@@ -50,78 +56,87 @@ def print_header():
     print(f"                        {RED}System Report{RESET} - {date}")
     print()
 
-def print_device_info():
+def collect_device_info():
     """
-    Prints device information including hostname and domain.
+    Collects device information including hostname and domain.
+    
+    Works like 'hostname -s' and 'hostname -d': the short name is the kernel hostname up to the first dot,
+    and the domain is whatever follows the first dot of the name the resolver gives for it.
     """
     
-    hostname, domain = "", ""
     # Get hostname and fully qualified domain name
+    name = socket.gethostname()
+    hostname = name.split('.')[0]
     try:
-        hostname = subprocess.check_output(['hostname', '-s'], text=True).strip()
-        domain = subprocess.check_output(['hostname', '-d'], text=True).strip()
-    except Exception as e:
-        hostname, domain = "N/A", "N/A"
+        fqdn = socket.gethostbyname_ex(name)[0]
+        domain = fqdn.partition('.')[2]
+    except OSError:
+        # The name does not resolve, only the domain is unknown
+        domain = "N/A"
+
+    return {'hostname': hostname, 'domain': domain}
+
+def print_device_info(info=None):
+    """
+    Prints device information including hostname and domain, collecting it first if not given.
+    """
+    if info is None:
+        info = collect_device_info()
 
     print(f"{GREEN}Device Information:{RESET}")
-    print(f"Hostname:          {hostname}")
-    print(f"Domain:            {domain}")
+    print(f"Hostname:          {info['hostname']}")
+    print(f"Domain:            {info['domain']}")
     print()
 
-def print_network_info():
+def collect_network_info():
     """
-    Prints network information including IP address, gateway, network mask, and DNS servers.
+    Collects network information including IP address, gateway, network mask, and DNS servers.
     
-    Uses 'ip' command to fetch the default interface and details.
+    Uses the netinfo module, which reads the default route and interface address from /proc.
     Parses /etc/resolv.conf for DNS servers.
     """
     
-    # Get default route information using 'ip route' command
-    route_output = subprocess.check_output(['ip', 'route', 'show', 'default']).decode()
-    # Extract gateway IP using regex
-    gateway_match = re.search(r'default via (\S+)', route_output)
-    gateway = gateway_match.group(1) if gateway_match else 'N/A'
-
-    # Extract network interface name
-    iface_match = re.search(r'dev (\S+)', route_output)
-    iface = iface_match.group(1) if iface_match else None
+    # Get the default gateway and the interface it goes out on
+    gateway, iface = netinfo.default_route()
+    gateway = gateway if gateway else 'N/A'
 
     ip_address = 'N/A'
     netmask = 'N/A'
     if iface:
-        # Get IP address details for the interface
-        addr_output = subprocess.check_output(['ip', 'addr', 'show', iface]).decode()
-        # Extract IP and prefix using regex
-        inet_match = re.search(r'inet ([\d.]+)/(\d+)', addr_output)
-        if inet_match:
-            ip_address = inet_match.group(1)
-            prefix = int(inet_match.group(2))
+        # Get IP address and prefix for the interface
+        address, prefix = netinfo.interface_address(iface)
+        if address:
+            ip_address = address
             # Calculate netmask from prefix length
-            mask = (0xffffffff << (32 - prefix)) & 0xffffffff
-            netmask = '.'.join(str((mask >> i) & 0xff) for i in [24, 16, 8, 0])
+            netmask = netinfo.prefix_to_netmask(prefix)
 
     # Read DNS servers from resolv.conf
-    dns_list = []
-    with open('/etc/resolv.conf', 'r') as f:
-        for line in f:
-            if line.strip().startswith('nameserver'):
-                dns_list.append(line.split()[1].strip())
+    dns_list = netinfo.nameservers()
 
     # Assign DNS1 and DNS2, duplicate DNS1 if only one is available
     dns1 = dns_list[0] if dns_list else 'N/A'
     dns2 = dns_list[1] if len(dns_list) > 1 else dns1
 
+    return {'ip_address': ip_address, 'gateway': gateway, 'netmask': netmask, 'dns1': dns1, 'dns2': dns2}
+
+def print_network_info(info=None):
+    """
+    Prints network information including IP address, gateway, network mask, and DNS servers, collecting it first if not given.
+    """
+    if info is None:
+        info = collect_network_info()
+
     print(f"{GREEN}Network Information:{RESET}")
-    print(f"IP Address:        {ip_address}")
-    print(f"Gateway:           {gateway}")
-    print(f"Network Mask:      {netmask}")
-    print(f"DNS1:              {dns1}")
-    print(f"DNS2:              {dns2}")
+    print(f"IP Address:        {info['ip_address']}")
+    print(f"Gateway:           {info['gateway']}")
+    print(f"Network Mask:      {info['netmask']}")
+    print(f"DNS1:              {info['dns1']}")
+    print(f"DNS2:              {info['dns2']}")
     print()
 
-def print_os_info():
+def collect_os_info():
     """
-    Prints operating system information including name, version, and kernel version.
+    Collects operating system information including name, version, and kernel version.
     
     Parses /etc/os-release for OS details and uses os.uname() for kernel.
     """
@@ -139,40 +154,67 @@ def print_os_info():
     # Get kernel version from uname
     kernel_version = os.uname().release
 
+    return {'os_name': os_name, 'os_version': os_version, 'kernel_version': kernel_version}
+
+def print_os_info(info=None):
+    """
+    Prints operating system information including name, version, and kernel version, collecting it first if not given.
+    """
+    if info is None:
+        info = collect_os_info()
+
     print(f"{GREEN}Operating System Information:{RESET}")
-    print(f"Operating System:  {os_name}")
-    print(f"OS Version:        {os_version}")
-    print(f"Kernel Version:    {kernel_version}")
+    print(f"Operating System:  {info['os_name']}")
+    print(f"OS Version:        {info['os_version']}")
+    print(f"Kernel Version:    {info['kernel_version']}")
     print()
 
-def print_storage_info():
+def gib_ceil(size):
     """
-    Prints storage information for the root filesystem using 'df' command.
+    Converts a size in bytes to whole GiB, rounding up like 'df -BG'
+    """
+    return -(-size // 1024 ** 3)
+
+def collect_storage_info():
+    """
+    Collects storage information for the root filesystem using os.statvfs().
     
-    Outputs total, used, and free space in GiB.
+    Outputs total, used, and free space in GiB, rounded up the same way as 'df -BG'.
     """
-    output = subprocess.check_output(['df', '-BG', '/']).decode('utf-8')
-    lines = output.splitlines()
-    if len(lines) > 1:
-        data = lines[1].split()
-        # Extract and clean total, used, free storage
-        total_storage = data[1].rstrip('G')
-        used_storage = data[2].rstrip('G')
-        free_storage = data[3].rstrip('G')
+    try:
+        stat = os.statvfs('/')
+    except OSError:
+        stat = None
+    if stat:
+        # df counts used as all blocks minus free ones, and free as what unprivileged users can still use
+        total_storage = gib_ceil(stat.f_blocks * stat.f_frsize)
+        used_storage = gib_ceil((stat.f_blocks - stat.f_bfree) * stat.f_frsize)
+        free_storage = gib_ceil(stat.f_bavail * stat.f_frsize)
     else:
         total_storage = 'N/A'
         used_storage = 'N/A'
         free_storage = 'N/A'
 
+    return {'total': total_storage, 'used': used_storage, 'free': free_storage}
+
+def print_storage_info(info=None):
+    """
+    Prints storage information for the root filesystem, collecting it first if not given.
+    
+    Outputs total, used, and free space in GiB.
+    """
+    if info is None:
+        info = collect_storage_info()
+
     print(f"{GREEN}Storage Information:{RESET}")
-    print(f"System Drive Total: {total_storage} GiB")
-    print(f"System Drive Used:  {used_storage} GiB")
-    print(f"System Drive Free:  {free_storage} GiB")
+    print(f"System Drive Total: {info['total']} GiB")
+    print(f"System Drive Used:  {info['used']} GiB")
+    print(f"System Drive Free:  {info['free']} GiB")
     print()
 
-def print_processor_info():
+def collect_processor_info():
     """
-    Prints processor information including model, number of processors, and cores per processor.
+    Collects processor information including model, number of processors, and cores per processor.
     
     Parses /proc/cpuinfo to extract details.
     """
@@ -209,49 +251,478 @@ def print_processor_info():
         # Get cores per socket from first entry
         num_cores = cpus[0].get('cpu cores', 'Unknown')
 
+    return {'cpu_model': cpu_model, 'processors': num_processors, 'cores': num_cores}
+
+def print_processor_info(info=None):
+    """
+    Prints processor information including model, number of processors, and cores per processor, collecting it first if not given.
+    """
+    if info is None:
+        info = collect_processor_info()
+
     print(f"{GREEN}Processor Information:{RESET}")
-    print(f"CPU Model:         {cpu_model}")
-    print(f"Number of processors: {num_processors}")
-    print(f"Number of cores:   {num_cores}")
+    print(f"CPU Model:         {info['cpu_model']}")
+    print(f"Number of processors: {info['processors']}")
+    print(f"Number of cores:   {info['cores']}")
     print()
 
-def print_memory_info():
+def collect_memory_info():
     """
-    Prints memory information including total and available RAM in GiB.
+    Collects memory information including total and available RAM in GiB.
     
-    Uses 'free' command to fetch details.
-    """
-    output = subprocess.check_output(['free', '-m']).decode('utf-8')
-    lines = output.splitlines()
-    mem_line = None
-    for line in lines:
-        if line.startswith('Mem:'):
-            mem_line = line
-            break
-    if mem_line:
-        data = re.split(r'\s+', mem_line)
-        # Convert MiB to GiB and round to one decimal
-        mem_total = round(int(data[1]) / 1024, 1)
-        mem_available = round(int(data[6]) / 1024, 1)
+    Parses /proc/meminfo, the same source the 'free' command reads.
+    """
+    meminfo = {}
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                # Values are in kB
+                meminfo[key] = int(value.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    if 'MemTotal' in meminfo:
+        # Kernels before 3.14 have no MemAvailable, fall back to free memory
+        available = meminfo.get('MemAvailable', meminfo.get('MemFree', 0))
+        # Whole MiB like 'free -m', then convert to GiB and round to one decimal
+        mem_total = round((meminfo['MemTotal'] // 1024) / 1024, 1)
+        mem_available = round((available // 1024) / 1024, 1)
     else:
         mem_total = 0
         mem_available = 0
 
+    return {'total': mem_total, 'available': mem_available}
+
+def print_memory_info(info=None):
+    """
+    Prints memory information including total and available RAM in GiB, collecting it first if not given.
+    """
+    if info is None:
+        info = collect_memory_info()
+
     print(f"{GREEN}Memory Information:{RESET}")
-    print(f"Total RAM:         {mem_total} GiB")
-    print(f"Available RAM:     {mem_available} GiB")
+    print(f"Total RAM:         {info['total']} GiB")
+    print(f"Available RAM:     {info['available']} GiB")
+
+# Report sections in the order they are printed, each a (name, collector, printer) triple
+SECTIONS = [
+    ('device', collect_device_info, print_device_info),
+    ('network', collect_network_info, print_network_info),
+    ('os', collect_os_info, print_os_info),
+    ('storage', collect_storage_info, print_storage_info),
+    ('processor', collect_processor_info, print_processor_info),
+    ('memory', collect_memory_info, print_memory_info),
+]
+
+def collect_all():
+    """
+    Runs every section's collector at the same time in a thread pool and returns their results in report order.
+
+    The collectors mostly wait on the resolver and /proc, so the whole collection takes about as long as the slowest one.
+    """
+    with ThreadPoolExecutor(max_workers=len(SECTIONS)) as pool:
+        futures = [pool.submit(collector) for _, collector, _ in SECTIONS]
+        return [future.result() for future in futures]
+
+def collect_record():
+    """
+    Collects every section and returns them as one dict keyed by section name, the structured form of the report
+    """
+    return {name: info for (name, _, _), info in zip(SECTIONS, collect_all())}
+
+def print_report(results):
+    """
+    Prints the header and every section from collected results, always in the same order.
+    """
+    print_header()
+    for (_, _, printer), info in zip(SECTIONS, results):
+        printer(info)
+
+"""
+Transports used by the inventory mode to collect the report sections of a host.
+
+Each has a collect(host) method returning the dict of collect_record() for that host, raising an
+exception if the host could not be reached.
+"""
+class LocalTransport(object):
+    def collect(self, host):
+        # Every host is this machine
+        return collect_record()
+
+class SshTransport(object):
+    def __init__(self, timeout=30, options=()):
+        # Seconds to wait for a host and extra ssh options such as "-i key" or "-p 2222"
+        self.timeout = timeout
+        self.options = list(options)
+        self.program = remote_program()
+    def collect(self, host):
+        # Feed the report to python3 on the host and read back its --json output
+        command = ['ssh', '-o', 'BatchMode=yes', '-o', f'ConnectTimeout={int(self.timeout)}', *self.options,
+                   host, 'python3', '-']
+        result = subprocess.run(command, input=self.program, capture_output=True, text=True, timeout=self.timeout)
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            raise OSError(lines[-1] if lines else f"ssh exited with status {result.returncode}")
+        return json.loads(result.stdout)
+
+class FakeTransport(object):
+    def __init__(self, delay=0.0, down=()):
+        # Seconds every host takes to answer, and hosts that act as unreachable
+        self.delay = delay
+        self.down = set(down)
+    def collect(self, host):
+        # Answer with this machine's sections under the host's name, for trying out the inventory without a fleet
+        time.sleep(self.delay)
+        if host in self.down:
+            raise OSError(f"{host}: fake host is down")
+        record = collect_record()
+        record['device'] = dict(record['device'], hostname=host.split('.')[0])
+        return record
+
+TRANSPORTS = {
+    'local': LocalTransport,
+    'ssh': SshTransport,
+    'fake': FakeTransport,
+}
+
+def remote_program():
+    """
+    Returns a Python program that runs this script with --json on a host that has neither it nor netinfo.py
+
+    Both sources are embedded, so nothing has to be copied to the host beforehand.
+    """
+    with open(os.path.abspath(__file__), 'r') as f:
+        report_source = f.read()
+    with open(os.path.abspath(netinfo.__file__), 'r') as f:
+        netinfo_source = f.read()
+    return (
+        "import sys, types\n"
+        "netinfo = types.ModuleType('netinfo')\n"
+        f"exec(compile({netinfo_source!r}, 'netinfo.py', 'exec'), netinfo.__dict__)\n"
+        "sys.modules['netinfo'] = netinfo\n"
+        "sys.argv = ['system_report.py', '--json']\n"
+        f"exec(compile({report_source!r}, 'system_report.py', 'exec'), {{'__name__': '__main__'}})\n"
+    )
+
+def collect_host(transport, host):
+    """
+    Collects one host through transport and returns its inventory record, with the error instead of sections on failure
+    """
+    start = time.perf_counter()
+    try:
+        record = {'host': host, 'ok': True}
+        record.update(transport.collect(host))
+    except (OSError, ValueError, subprocess.SubprocessError) as e:
+        record = {'host': host, 'ok': False, 'error': str(e) or type(e).__name__}
+    record['seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+def inventory(hosts, transport, jobs=32, on_record=None):
+    """
+    Collects every host through transport with at most jobs hosts in flight, returns the records in hosts order
+
+    on_record is called with each record as soon as its host answers.
+    """
+    records = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(hosts)))) as pool:
+        futures = {pool.submit(collect_host, transport, host): host for host in hosts}
+        for future in as_completed(futures):
+            record = future.result()
+            records[futures[future]] = record
+            if on_record:
+                on_record(record)
+    return [records[host] for host in hosts]
+
+def print_inventory_table(records, seconds):
+    """
+    Prints one row per host and a totals line for the fleet
+    """
+    print(f"{RED}HOST\t\tSTATUS\tOS\t\t\t\tKERNEL\t\t\tCPUS\tRAM GiB\tDISK USED/TOTAL GiB\tIP ADDRESS{RESET}")
+    ram = 0.0
+    disk_used = 0
+    disk_total = 0
+    for record in records:
+        if not record['ok']:
+            print(f"{record['host']}\t\t{RED}DOWN{RESET}\t{record['error']}")
+            continue
+        storage = record['storage']
+        print(f"{record['host']}\t\t{GREEN}OK{RESET}\t{record['os']['os_name']}\t{record['os']['kernel_version']}\t"
+              f"{record['processor']['processors']}x{record['processor']['cores']}\t{record['memory']['total']}\t"
+              f"{storage['used']}/{storage['total']}\t\t{record['network']['ip_address']}")
+        ram += record['memory']['total']
+        # Storage is 'N/A' when the host could not read it
+        if isinstance(storage['total'], int):
+            disk_used += storage['used']
+            disk_total += storage['total']
+    up = sum(1 for record in records if record['ok'])
+    print()
+    print(f"{GREEN}{len(records)} hosts{RESET}, {up} up, {len(records) - up} down in {seconds:.1f} s")
+    print(f"Total RAM:         {ram:.1f} GiB")
+    print(f"Total storage:     {disk_used}/{disk_total} GiB used")
+
+"""
+Reads the counters the agent mode samples.
+
+The /proc files are opened once and re-read from the start on every sample, so a sample costs a few
+reads and one statvfs() call instead of opening files or starting processes.
+"""
+class Sampler(object):
+    def __init__(self, path='/'):
+        # Filesystem whose storage is sampled, and the /proc files kept open between samples
+        self.path = path
+        self.meminfo = open('/proc/meminfo', 'r')
+        self.stat = open('/proc/stat', 'r')
+        self.net_dev = open('/proc/net/dev', 'r')
+    def read(self, f):
+        # Rewind and re-read a /proc file, the kernel regenerates its content on every read
+        f.seek(0)
+        return f.read()
+    def sample(self):
+        # Returns the raw counters, rates are worked out by comparing two samples
+        memory = {}
+        for line in self.read(self.meminfo).splitlines():
+            key, _, value = line.partition(':')
+            if key in ('MemTotal', 'MemFree', 'MemAvailable'):
+                memory[key] = int(value.split()[0])
+
+        # First line is "cpu user nice system idle iowait irq softirq steal guest guest_nice" in ticks,
+        # guest time is already part of user time
+        cpu = [int(value) for value in self.read(self.stat).split('\n', 1)[0].split()[1:9]]
+
+        interfaces = {}
+        # Two header lines, then "iface: rx_bytes ... (8 receive fields) tx_bytes ..."
+        for line in self.read(self.net_dev).splitlines()[2:]:
+            iface, _, counters = line.partition(':')
+            fields = counters.split()
+            interfaces[iface.strip()] = (int(fields[0]), int(fields[8]))
+
+        storage = os.statvfs(self.path)
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            'time': time.monotonic(),
+            'memory': memory,
+            'cpu_busy': sum(cpu) - cpu[3] - cpu[4],
+            'cpu_total': sum(cpu),
+            'interfaces': interfaces,
+            'storage': storage,
+            'agent_cpu': usage.ru_utime + usage.ru_stime,
+        }
+    def close(self):
+        # Close the kept /proc files
+        for f in (self.meminfo, self.stat, self.net_dev):
+            f.close()
+
+def sample_record(previous, current):
+    """
+    Returns the compact record for the interval between two samples, rates are per second and percentages of the interval
+    """
+    seconds = current['time'] - previous['time']
+    memory = current['memory']
+    # Kernels before 3.14 have no MemAvailable, fall back to free memory
+    available = memory.get('MemAvailable', memory.get('MemFree', 0))
+    storage = current['storage']
+    # Used share of what users can have, the way df works out Use%
+    disk_used = storage.f_blocks - storage.f_bfree
+    disk_usable = disk_used + storage.f_bavail
+    cpu_total = current['cpu_total'] - previous['cpu_total']
+
+    network = {}
+    for iface, (rx, tx) in current['interfaces'].items():
+        if iface in previous['interfaces']:
+            old_rx, old_tx = previous['interfaces'][iface]
+            # Counters go back to zero when a driver is reloaded, count that interval as idle
+            network[iface] = [round(max(0, rx - old_rx) / seconds), round(max(0, tx - old_tx) / seconds)]
+
+    return {
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'cpu_pct': round(100 * (current['cpu_busy'] - previous['cpu_busy']) / cpu_total, 1) if cpu_total else 0.0,
+        'mem_available_mib': available // 1024,
+        'mem_used_pct': round(100 * (1 - available / memory['MemTotal']), 1) if memory.get('MemTotal') else 0.0,
+        'disk_free_gib': round(storage.f_bavail * storage.f_frsize / 1024 ** 3, 1),
+        'disk_used_pct': round(100 * disk_used / disk_usable, 1) if disk_usable else 0.0,
+        'net_bytes_per_sec': network,
+        'agent_cpu_pct': round(100 * (current['agent_cpu'] - previous['agent_cpu']) / seconds, 3),
+    }
+
+"""
+An append-only log that rotates like logrotate: when the file would grow past max_bytes it is renamed
+to path.1, path.1 to path.2 and so on, keeping at most backups old files.
+"""
+class RotatingLog(object):
+    def __init__(self, path, max_bytes=1024 * 1024, backups=5):
+        # Open the log for appending, picking up the size of an existing file
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.f = open(path, 'a')
+        self.size = self.f.tell()
+    def write(self, line):
+        # Append one line, rotating first if it would not fit
+        if self.size and self.size + len(line) > self.max_bytes:
+            self.rotate()
+        self.f.write(line)
+        self.f.flush()
+        self.size += len(line)
+    def rotate(self):
+        # Shift the old files up by one and start a new log
+        self.f.close()
+        for number in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{number}"):
+                os.replace(f"{self.path}.{number}", f"{self.path}.{number + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self.f = open(self.path, 'w')
+        self.size = 0
+    def close(self):
+        # Close the current log file
+        self.f.close()
+
+def run_agent(log, interval=10.0, count=None):
+    """
+    Samples every interval seconds and appends one JSON record per interval to log, until interrupted or count records are written
+
+    Samples are taken on a fixed schedule, so a slow sample does not push the following ones later.
+    """
+    sampler = Sampler()
+    written = 0
+    try:
+        previous = sampler.sample()
+        deadline = previous['time']
+        while count is None or written < count:
+            deadline += interval
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            current = sampler.sample()
+            log.write(json.dumps(sample_record(previous, current), separators=(',', ':')) + '\n')
+            previous = current
+            written += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sampler.close()
+
+def parse_args():
+    """
+    Parses the command line options
+    """
+    parser = argparse.ArgumentParser(description="Print a system report for this machine, or an inventory of many hosts")
+    parser.add_argument('--json', action='store_true',
+                        help="print this machine's report sections as one JSON object instead of the report")
+    parser.add_argument('--inventory', nargs='+', default=[], metavar='HOST',
+                        help="collect the report sections of these hosts instead of this machine")
+    parser.add_argument('--hosts-file', metavar='FILE',
+                        help="inventory the hosts listed in FILE, one per line, # starts a comment")
+    parser.add_argument('--transport', choices=sorted(TRANSPORTS), default='ssh',
+                        help="how inventory hosts are reached, fake answers locally for testing (default: ssh)")
+    parser.add_argument('-j', '--jobs', type=int, default=32,
+                        help="number of inventory hosts collected at the same time (default: 32)")
+    parser.add_argument('--format', dest='output_format', choices=('table', 'json', 'ndjson'), default='table',
+                        help="inventory output format, ndjson prints each host as soon as it answers (default: table)")
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help="seconds to wait for each ssh host (default: 30)")
+    parser.add_argument('--ssh-option', action='append', default=[], metavar='OPTION',
+                        help="extra argument passed to ssh, can be repeated, e.g. --ssh-option=-p2222")
+    parser.add_argument('--fake-delay', type=float, default=0.1,
+                        help="seconds each host takes to answer with the fake transport (default: 0.1)")
+    parser.add_argument('--fake-down', action='append', default=[], metavar='HOST',
+                        help="host the fake transport reports as unreachable, can be repeated")
+    parser.add_argument('--agent', action='store_true',
+                        help="keep running and append memory, storage, CPU and network rates to a rotating log")
+    parser.add_argument('--interval', type=float, default=10.0,
+                        help="seconds between agent samples (default: 10)")
+    parser.add_argument('--count', type=int, default=None,
+                        help="stop the agent after this many records (default: run until interrupted)")
+    parser.add_argument('--agent-log', metavar='FILE',
+                        help="agent log file, - for standard output (default: ~/<hostname>_system_agent.log)")
+    parser.add_argument('--max-bytes', type=int, default=1024 * 1024,
+                        help="size at which the agent log is rotated (default: 1048576)")
+    parser.add_argument('--backups', type=int, default=5,
+                        help="number of rotated agent logs to keep (default: 5)")
+    args = parser.parse_args()
+
+    args.hosts = list(args.inventory)
+    if args.hosts_file:
+        try:
+            with open(args.hosts_file, 'r') as f:
+                for line in f:
+                    line = line.split('#')[0].strip()
+                    if line:
+                        args.hosts.append(line)
+        except OSError as e:
+            parser.error(f"cannot read --hosts-file: {e}")
+        if not args.hosts:
+            parser.error("--hosts-file lists no hosts")
+    if sum([args.json, bool(args.hosts), args.agent]) > 1:
+        parser.error("--json, --inventory/--hosts-file and --agent cannot be used together")
+    if args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+    if args.count is not None and args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.max_bytes < 1 or args.backups < 0:
+        parser.error("--max-bytes must be at least 1 and --backups at least 0")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.timeout <= 0:
+        parser.error("--timeout must be greater than 0")
+    return args
+
+def run_inventory(args):
+    """
+    Runs the inventory mode for the parsed options and prints the records in the chosen format
+    """
+    if args.transport == 'ssh':
+        transport = SshTransport(args.timeout, args.ssh_option)
+    elif args.transport == 'fake':
+        transport = FakeTransport(args.fake_delay, args.fake_down)
+    else:
+        transport = LocalTransport()
+
+    on_record = None
+    if args.output_format == 'ndjson':
+        on_record = lambda record: print(json.dumps(record), flush=True)
+
+    start = time.perf_counter()
+    records = inventory(args.hosts, transport, args.jobs, on_record)
+    seconds = time.perf_counter() - start
+
+    if args.output_format == 'json':
+        json.dump(records, sys.stdout, indent=2)
+        print()
+    elif args.output_format == 'table':
+        print_inventory_table(records, seconds)
 
 if __name__ == "__main__":
     """
     Main execution block.
     
     Clears terminal, sets up logging to a file in the home directory and duplicates output to console and file.
-    Calls all print functions in sequence to generate the full report.
+    Collects every section concurrently, then prints them in order to generate the full report.
+    With --json or an inventory of hosts, prints structured records instead.
     """
+    args = parse_args()
+    if args.json:
+        print(json.dumps(collect_record()))
+        sys.exit(0)
+    if args.hosts:
+        run_inventory(args)
+        sys.exit(0)
+    if args.agent:
+        if args.agent_log == '-':
+            log = sys.stdout
+        else:
+            log_path = args.agent_log or os.path.join(os.path.expanduser('~'), f"{socket.gethostname().split('.')[0]}_system_agent.log")
+            log = RotatingLog(log_path, args.max_bytes, args.backups)
+        run_agent(log, args.interval, args.count)
+        if log is not sys.stdout:
+            log.close()
+        sys.exit(0)
+
     clear()
 
+    # Gather all sections before anything is printed
+    results = collect_all()
+
     # Get hostname for log file naming
-    hostname = subprocess.check_output(['hostname', '-s'], text=True).strip()
+    hostname = socket.gethostname().split('.')[0]
     # Expand user's home directory path
     home_dir = os.path.expanduser('~')
     # Construct log file path
@@ -264,14 +735,8 @@ if __name__ == "__main__":
         # Redirect stdout to Tee for dual output
         sys.stdout = Tee(original_stdout, log_file)
         
-        # Call all print functions in order
-        print_header()
-        print_device_info()
-        print_network_info()
-        print_os_info()
-        print_storage_info()
-        print_processor_info()
-        print_memory_info()
+        # Print all sections in order
+        print_report(results)
         
         # Restore original stdout
         sys.stdout = original_stdout